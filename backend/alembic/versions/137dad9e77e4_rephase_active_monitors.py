@@ -0,0 +1,57 @@
+"""Rephase active monitors
+
+Revision ID: 137dad9e77e4
+Revises: 4f8a1c6e2b93
+Create Date: 2026-10-17 21:40:52.610374
+
+"""
+
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.core.schedule_phase import next_phase_run
+
+# revision identifiers, used by Alembic.
+revision: str = "137dad9e77e4"
+down_revision: Union[str, Sequence[str], None] = "4f8a1c6e2b93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # monitors created before the phase spread keep the runs of their last
+    # check: move them to their phase once, at most one interval later.
+    # A `zset` timing wheel built before keeps its runs, drop the
+    # monitors:schedule:* keys for the leader to rebuild it from db
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    monitors = bind.execute(
+        sa.text("SELECT id, check_interval_sec FROM monitors WHERE is_active").columns(
+            id=sa.Uuid(), check_interval_sec=sa.Integer()
+        )
+    ).all()
+    set_next_check_at = sa.text(
+        "UPDATE monitors SET next_check_at = :next_check_at WHERE id = :id"
+    ).bindparams(
+        sa.bindparam("id", type_=sa.Uuid()),
+        sa.bindparam("next_check_at", type_=sa.DateTime(timezone=True)),
+    )
+
+    runs = [
+        {"id": monitor_id, "next_check_at": next_phase_run(monitor_id, interval, now)}
+        for monitor_id, interval in monitors
+    ]
+    for i in range(0, len(runs), _BATCH_SIZE):
+        bind.execute(set_next_check_at, runs[i : i + _BATCH_SIZE])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # previous runs aren't kept, the spread phases are as good
+    pass
@@ -0,0 +1,71 @@
+"""Add monitor schedule columns
+
+Revision ID: 3b9f2c1d7a40
+Revises: dd7325f069b5
+Create Date: 2026-10-17 10:12:04.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3b9f2c1d7a40"
+down_revision: Union[str, Sequence[str], None] = "dd7325f069b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "monitors",
+        sa.Column("last_checked_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "monitors",
+        sa.Column(
+            "next_check_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+    # backfill from history, monitors without checks stay due right away
+    op.execute(
+        """
+        UPDATE monitors AS m
+        SET last_checked_at = last.checked_at,
+            next_check_at = last.checked_at
+                + m.check_interval_sec * INTERVAL '1 second'
+        FROM (
+            SELECT monitor_id, max(checked_at) AS checked_at
+            FROM check_results
+            GROUP BY monitor_id
+        ) AS last
+        WHERE last.monitor_id = m.id
+        """
+    )
+
+    op.create_index(
+        "ix_monitors_next_check_at_active",
+        "monitors",
+        ["next_check_at"],
+        unique=False,
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_monitors_next_check_at_active",
+        table_name="monitors",
+        postgresql_where=sa.text("is_active"),
+    )
+    op.drop_column("monitors", "next_check_at")
+    op.drop_column("monitors", "last_checked_at")
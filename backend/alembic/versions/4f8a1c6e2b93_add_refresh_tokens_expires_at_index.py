@@ -0,0 +1,33 @@
+"""Add refresh_tokens expires_at index
+
+Revision ID: 4f8a1c6e2b93
+Revises: e2a6f4c81b07
+Create Date: 2026-10-17 19:02:13.418207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4f8a1c6e2b93"
+down_revision: Union[str, Sequence[str], None] = "e2a6f4c81b07"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # range scan for the sweep of expired tokens
+    op.create_index(
+        op.f("ix_refresh_tokens_expires_at"),
+        "refresh_tokens",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_refresh_tokens_expires_at"), table_name="refresh_tokens")
@@ -0,0 +1,56 @@
+"""Add check_results (monitor_id, checked_at) index
+
+Revision ID: 8c41e7a2d9f3
+Revises: 3b9f2c1d7a40
+Create Date: 2026-10-17 12:40:51.902611
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41e7a2d9f3"
+down_revision: Union[str, Sequence[str], None] = "3b9f2c1d7a40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # built without locking writes of check_results
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_check_results_monitor_id_checked_at",
+            "check_results",
+            ["monitor_id", sa.text("checked_at DESC")],
+            unique=False,
+            postgresql_include=["is_up", "response_time_ms", "status_code"],
+            postgresql_concurrently=True,
+        )
+        # prefix of the new index
+        op.drop_index(
+            "ix_check_results_monitor_id",
+            table_name="check_results",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_check_results_monitor_id",
+            "check_results",
+            ["monitor_id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_check_results_monitor_id_checked_at",
+            table_name="check_results",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,46 @@
+"""Add id to check_results (monitor_id, checked_at) index
+
+Revision ID: a3c9e5d17b62
+Revises: 137dad9e77e4
+Create Date: 2026-10-17 22:31:08.245917
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c9e5d17b62"
+down_revision: Union[str, Sequence[str], None] = "137dad9e77e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_check_results_monitor_id_checked_at"
+INDEX_INCLUDE = ["is_up", "response_time_ms", "status_code"]
+
+
+def _recreate_index(columns: list) -> None:
+    # indexes of a partitioned table can't be built concurrently,
+    # partitions get theirs with the parent one
+    op.drop_index(INDEX_NAME, table_name="check_results")
+    op.create_index(
+        INDEX_NAME,
+        "check_results",
+        columns,
+        unique=False,
+        postgresql_include=INDEX_INCLUDE,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # id breaks ties of keyset pages in the index order, no incremental sort
+    _recreate_index(["monitor_id", sa.text("checked_at DESC"), sa.text("id DESC")])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_index(["monitor_id", sa.text("checked_at DESC")])
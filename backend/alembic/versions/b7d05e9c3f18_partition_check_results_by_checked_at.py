@@ -0,0 +1,142 @@
+"""Partition check_results by checked_at
+
+Revision ID: b7d05e9c3f18
+Revises: 8c41e7a2d9f3
+Create Date: 2026-10-17 15:03:27.118640
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d05e9c3f18"
+down_revision: Union[str, Sequence[str], None] = "8c41e7a2d9f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = "ix_check_results_monitor_id_checked_at"
+INDEX_INCLUDE = ["is_up", "response_time_ms", "status_code"]
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("monitor_id", sa.UUID(), nullable=False),
+        sa.Column(
+            "checked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("is_up", sa.Boolean(), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("response_time_ms", sa.Integer(), nullable=True),
+        sa.Column("error_message", sa.String(length=1000), nullable=True),
+        sa.ForeignKeyConstraint(["monitor_id"], ["monitors.id"], ondelete="CASCADE"),
+    ]
+
+
+def _rename_old_table() -> None:
+    op.rename_table("check_results", "check_results_old")
+    op.execute(
+        "ALTER TABLE check_results_old "
+        "RENAME CONSTRAINT check_results_pkey TO check_results_old_pkey"
+    )
+    op.execute(
+        "ALTER TABLE check_results_old "
+        "RENAME CONSTRAINT check_results_monitor_id_fkey "
+        "TO check_results_old_monitor_id_fkey"
+    )
+    op.execute(f"ALTER INDEX {INDEX_NAME} RENAME TO {INDEX_NAME}_old")
+
+
+def _copy_rows_and_drop_old_table() -> None:
+    op.execute(
+        """
+        INSERT INTO check_results (id, monitor_id, checked_at, is_up,
+                                   status_code, response_time_ms, error_message)
+        SELECT id, monitor_id, checked_at, is_up,
+               status_code, response_time_ms, error_message
+        FROM check_results_old
+        """
+    )
+    op.drop_table("check_results_old")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_old_table()
+
+    op.create_table(
+        "check_results",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id", "checked_at"),
+        postgresql_partition_by="RANGE (checked_at)",
+    )
+    op.execute("CREATE TABLE check_results_default PARTITION OF check_results DEFAULT")
+
+    # weekly partitions for the whole history and 4 weeks ahead,
+    # later ones are created by maintain_check_result_partitions task
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            start_ts timestamptz := date_trunc(
+                'week',
+                coalesce((SELECT min(checked_at) FROM check_results_old), now()),
+                'UTC'
+            );
+            end_ts timestamptz := date_trunc('week', now(), 'UTC')
+                + interval '5 weeks';
+        BEGIN
+            WHILE start_ts < end_ts LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF check_results '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'check_results_p'
+                        || to_char(start_ts AT TIME ZONE 'UTC', 'YYYYMMDD'),
+                    start_ts,
+                    start_ts + interval '1 week'
+                );
+                start_ts := start_ts + interval '1 week';
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    _copy_rows_and_drop_old_table()
+
+    op.create_index(
+        INDEX_NAME,
+        "check_results",
+        ["monitor_id", sa.text("checked_at DESC")],
+        unique=False,
+        postgresql_include=INDEX_INCLUDE,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _rename_old_table()
+
+    op.create_table(
+        "check_results",
+        *_columns(),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # drops all partitions with the parent table
+    _copy_rows_and_drop_old_table()
+
+    op.create_index(
+        INDEX_NAME,
+        "check_results",
+        ["monitor_id", sa.text("checked_at DESC")],
+        unique=False,
+        postgresql_include=INDEX_INCLUDE,
+    )
@@ -0,0 +1,64 @@
+"""Add check_result_rollups table
+
+Revision ID: e2a6f4c81b07
+Revises: b7d05e9c3f18
+Create Date: 2026-10-17 17:21:45.660394
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2a6f4c81b07"
+down_revision: Union[str, Sequence[str], None] = "b7d05e9c3f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# len(app.services.rollups.LATENCY_BUCKETS_MS) + 1
+HISTOGRAM_SIZE = 19
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "check_result_rollups",
+        sa.Column("monitor_id", sa.UUID(), nullable=False),
+        sa.Column("bucket_sec", sa.Integer(), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("total_checks", sa.Integer(), nullable=False),
+        sa.Column("up_checks", sa.Integer(), nullable=False),
+        sa.Column("response_time_sum", sa.BigInteger(), nullable=False),
+        sa.Column("response_time_count", sa.Integer(), nullable=False),
+        sa.Column("response_time_min", sa.Integer(), nullable=True),
+        sa.Column("response_time_max", sa.Integer(), nullable=True),
+        sa.Column("latency_histogram", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.ForeignKeyConstraint(["monitor_id"], ["monitors.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("monitor_id", "bucket_sec", "bucket_start"),
+    )
+
+    # history still kept in check_results, histogram stays empty for it
+    op.execute(
+        f"""
+        INSERT INTO check_result_rollups (monitor_id, bucket_sec, bucket_start,
+            total_checks, up_checks, response_time_sum, response_time_count,
+            response_time_min, response_time_max, latency_histogram)
+        SELECT monitor_id, s.sec,
+               to_timestamp(floor(extract(epoch FROM checked_at) / s.sec) * s.sec),
+               count(*), count(*) FILTER (WHERE is_up),
+               coalesce(sum(response_time_ms), 0), count(response_time_ms),
+               min(response_time_ms), max(response_time_ms),
+               array_fill(0, ARRAY[{HISTOGRAM_SIZE}])
+        FROM check_results, (VALUES (60), (3600), (86400)) AS s(sec)
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("check_result_rollups")
@@ -1,21 +1,21 @@
 import logging
-from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user_profile, oauth2_scheme
 from app.core.security import (
+    PasswordHashingOverloaded,
     create_access_token,
     create_refresh_token,
-    verify_password,
+    password_hasher,
+    revoke_access_token,
+    rotate_refresh_token,
+    user_token_claims,
 )
-from app.crud.user import get_user_by_email
+from app.crud.user import get_user_by_email, users_cache
 from app.db.session import get_async_db
-from app.models import RefreshToken
 from app.schemas.auth import RefreshTokenRequest, TokenResponse
 from app.schemas.user import UserRead
 
@@ -31,16 +31,34 @@ async def login(
 ) -> TokenResponse:
     user = await get_user_by_email(db, form_data.username)
 
-    if not user or not verify_password(form_data.password, str(user.hashed_password)):
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await password_hasher.verify_and_update(
+                form_data.password, str(user.hashed_password)
+            )
+        except PasswordHashingOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many logins, try again later",
+            )
+
+    if not verified:
         logger.warning("Login failed for email=%s", form_data.username)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid email or password",
         )
 
-    access_token = create_access_token({"sub": str(user.id)})
+    if new_hash:
+        # other kdf / cost in settings: committed with the refresh token
+        user.hashed_password = new_hash
+
+    access_token = create_access_token(user_token_claims(user))
 
     refresh_token = await create_refresh_token(db, user.id)
+    if new_hash:
+        await users_cache.invalidate(str(user.id))
 
     logger.info("Login success user_id=%s", user.id)
 
@@ -51,46 +69,33 @@ async def login(
 async def refresh_token(
     request: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)
 ) -> TokenResponse:
-    db_token = (
-        await db.scalars(
-            select(RefreshToken)
-            .where(RefreshToken.token == request.refresh_token)
-            .options(selectinload(RefreshToken.user))
-        )
-    ).first()
-
-    if not db_token:
+    """Old refresh token is replaced by the new one, it can't be used twice"""
+    rotated = await rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
 
-    if db_token.expires_at < datetime.now(timezone.utc):
-        await db.delete(db_token)
-        await db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Refresh token expired",
-        )
-
-    user = db_token.user
-    if not user:
-        await db.delete(db_token)
-        await db.commit()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
-        )
+    new_refresh_token, user = rotated
+    access_token = create_access_token(user_token_claims(user))
 
-    await db.delete(db_token)
-    await db.commit()
+    return TokenResponse(access_token=access_token, refresh_token=new_refresh_token)
 
-    access_token = create_access_token({"sub": str(user.id)})
-    new_refresh_token = await create_refresh_token(db, user.id)
 
-    return TokenResponse(access_token=access_token, refresh_token=new_refresh_token)
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(token: str = Depends(oauth2_scheme)) -> None:
+    """Revoke the access token of request"""
+    try:
+        await revoke_access_token(token)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
 
 
 @router.get("/me", response_model=UserRead)
-async def read_me(current_user=Depends(get_current_user)) -> UserRead:
+async def read_me(current_user=Depends(get_current_user_profile)) -> UserRead:
     """Return cur user of token"""
     return current_user
@@ -1,9 +1,30 @@
+import logging
+
 from fastapi import APIRouter
+from redis.exceptions import RedisError
+
+from app.core.redis_client import get_redis_client
+from app.core.security import password_hasher
+from app.services.dispatch import get_dispatch_metrics
+
+logger = logging.getLogger("app.api.health")
 
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
-def health_check():
-    """Check service is up"""
-    return {"status": "ok"}
+async def health_check():
+    """
+    Check service is up, with load of password hashing pool of the worker
+    and checks dispatched / suppressed as duplicates by schedulers
+    """
+    try:
+        dispatch = await get_dispatch_metrics(get_redis_client())
+    except RedisError as exc:
+        logger.warning(f"Dispatch metrics are unavailable: {exc}")
+        dispatch = None
+    return {
+        "status": "ok",
+        "password_hashing": password_hasher.snapshot(),
+        "dispatch": dispatch,
+    }
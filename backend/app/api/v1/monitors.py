@@ -1,29 +1,31 @@
 import time
 import uuid
 from datetime import datetime
+from typing import Literal
 
 import httpx
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, get_owned_monitor
+from app.core.pagination import get_page_cursor, set_next_cursor
 from app.crud.check_result import (
-    create_check_result,
     get_checks_in_period,
     get_recent_results_for_monitor,
 )
 from app.crud.monitor import (
     create_monitor,
-    get_monitor,
     get_monitors_for_owner_by_ids,
     get_monitors_for_project,
     set_monitors_status_by_ids,
     update_monitor,
 )
-from app.crud.project import get_project
-from app.db.session import get_async_db
+from app.crud.project import get_project, get_project_owner_id
+from app.db.session import async_session_maker, get_async_db
+from app.models.monitor import Monitor as MonitorModel
 from app.models.user import User as UserModel
-from app.schemas.check_result import CheckResultRead
+from app.schemas.check_result import CheckResultRead, CheckSeries
 from app.schemas.monitor import (
     MonitorCreate,
     MonitorEdit,
@@ -31,7 +33,10 @@ from app.schemas.monitor import (
     MonitorRead,
     MonitorStats,
 )
+from app.services.export import EXPORT_MEDIA_TYPES, stream_check_results_export
 from app.services.monitoring import check_monitor_once
+from app.services.schedule import schedule_monitors, sync_monitors_schedule
+from app.services.series import get_check_series, pick_bucket_sec
 from app.services.stats import compute_monitor_stats
 
 router = APIRouter(prefix="/monitors", tags=["monitors"])
@@ -61,7 +66,9 @@ async def create_monitor_for_project_endpoint(
             detail="Not enough permissions for this project",
         )
 
-    return await create_monitor(db, project, monitor_in)
+    monitor = await create_monitor(db, project, monitor_in)
+    await schedule_monitors([monitor])
+    return monitor
 
 
 @router.get("/projects/{project_id}", response_model=list[MonitorRead])
@@ -73,13 +80,13 @@ async def get_monitors_for_project_endpoint(
     current_user: UserModel = Depends(get_current_user),
 ) -> list[MonitorRead]:
 
-    project = await get_project(db, project_id)
-    if not project:
+    owner_id = await get_project_owner_id(db, project_id)
+    if not owner_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
         )
 
-    if project.owner_id != current_user.id:
+    if owner_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions for this project",
@@ -90,22 +97,8 @@ async def get_monitors_for_project_endpoint(
 
 @router.get("/{monitor_id}", response_model=MonitorRead)
 async def get_monitor_by_id_endpoint(
-    monitor_id: uuid.UUID,
-    db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    monitor: MonitorModel = Depends(get_owned_monitor),
 ) -> MonitorRead:
-    monitor = await get_monitor(db, monitor_id)
-    if not monitor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    project = await get_project(db, monitor.project_id)
-    if not project or project.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
     return monitor
 
 
@@ -115,58 +108,38 @@ async def get_monitor_by_id_endpoint(
     status_code=status.HTTP_201_CREATED,
 )
 async def check_monitor_now_endpoint(
-    monitor_id: uuid.UUID,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    monitor: MonitorModel = Depends(get_owned_monitor),
 ) -> CheckResultRead:
-    monitor = await get_monitor(db, monitor_id)
-    if not monitor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    project = await get_project(db, monitor.project_id)
-    if not project or project.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
     return await check_monitor_once(db, monitor)
 
 
 @router.get("/{monitor_id}/checks", response_model=list[CheckResultRead])
 async def get_recent_checks_for_monitor_endpoint(
-    monitor_id: uuid.UUID,
+    response: Response,
     limit: int = 20,
+    before: tuple[datetime, uuid.UUID] | None = Depends(get_page_cursor),
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    monitor: MonitorModel = Depends(get_owned_monitor),
 ) -> list[CheckResultRead]:
+    """
+    Newest checks first, older pages by cursor from X-Next-Cursor header
+    """
     if limit < 1 or limit > 1000:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Limit must be between 1 and 200",
+            detail="Limit must be between 1 and 1000",
         )
 
-    monitor = await get_monitor(db, monitor_id)
-    if not monitor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    project = await get_project(db, monitor.project_id)
-    if not project or project.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    return list(await get_recent_results_for_monitor(db, monitor.id, limit))
+    results = await get_recent_results_for_monitor(db, monitor.id, limit, before)
+    set_next_cursor(response, results, limit)
+    return list(results)
 
 
 @router.get("/{monitor_id}/stats", response_model=MonitorStats)
 async def get_monitor_stats_endpoint(
-    monitor_id: uuid.UUID,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    monitor: MonitorModel = Depends(get_owned_monitor),
     from_ts: datetime | None = Query(None, description="Start of interval (UTC)"),
     to_ts: datetime | None = Query(None, description="Start of interval (UTC)"),
 ) -> MonitorStats:
@@ -175,23 +148,9 @@ async def get_monitor_stats_endpoint(
     if from_ts / to_ts is None - period = last 24 hours
     """
 
-    monitor = await get_monitor(db, monitor_id)
-    if not monitor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Monitor not found",
-        )
-
-    project = await get_project(db, monitor.project_id)
-    if not project or project.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Monitor not found",
-        )
-
     stats = await compute_monitor_stats(
         db,
-        monitor_id,
+        monitor.id,
         from_ts=from_ts,
         to_ts=to_ts,
     )
@@ -199,27 +158,60 @@ async def get_monitor_stats_endpoint(
     return stats
 
 
-@router.get("/{monitor_id}/checks-history", response_model=list[CheckResultRead])
+@router.get(
+    "/{monitor_id}/checks-history",
+    response_model=list[CheckResultRead] | CheckSeries,
+)
 async def get_checks_history_endpoint(
-    monitor_id: uuid.UUID,
     from_ts: datetime,
     to_ts: datetime,
+    response: Response,
+    max_points: int | None = Query(
+        None, ge=1, description="Return bucketed series of at most N points"
+    ),
+    resolution: int | None = Query(
+        None, ge=1, description="Return bucketed series, bucket size in seconds"
+    ),
+    limit: int = Query(1000, ge=1, le=5000, description="Page size of raw checks"),
+    after: tuple[datetime, uuid.UUID] | None = Depends(get_page_cursor),
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
-) -> list[CheckResultRead]:
-    monitor = await get_monitor(db, monitor_id)
-    if not monitor:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    project = await get_project(db, monitor.project_id)
-    if not project and current_user != project.owner_id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Project not found"
-        )
-
-    return list(await get_checks_in_period(db, monitor_id, from_ts, to_ts))
+    monitor: MonitorModel = Depends(get_owned_monitor),
+) -> list[CheckResultRead] | CheckSeries:
+    """
+    Raw checks in period, oldest first, paged by cursor from X-Next-Cursor header.
+    with max_points / resolution - series of uptime and latency per bucket
+    """
+    if max_points is not None or resolution is not None:
+        bucket_sec = pick_bucket_sec(from_ts, to_ts, max_points, resolution)
+        return await get_check_series(db, monitor.id, from_ts, to_ts, bucket_sec)
+
+    results = await get_checks_in_period(db, monitor.id, from_ts, to_ts, limit, after)
+    set_next_cursor(response, results, limit)
+    return list(results)
+
+
+@router.get("/{monitor_id}/checks-export", response_class=StreamingResponse)
+async def export_checks_endpoint(
+    from_ts: datetime | None = Query(None, description="Start of checks(UTC)"),
+    to_ts: datetime | None = Query(None, description="End of checks(UTC)"),
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    monitor: MonitorModel = Depends(get_owned_monitor),
+) -> StreamingResponse:
+    """
+    Raw checks in period as NDJSON / CSV, oldest first.
+    Rows are streamed from a server-side cursor, no limit on range
+    """
+    return StreamingResponse(
+        stream_check_results_export(
+            async_session_maker, monitor.id, from_ts, to_ts, export_format
+        ),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="checks-{monitor.id}.{export_format}"'
+            )
+        },
+    )
 
 
 @router.put("/bulk-set-status", response_model=int)
@@ -248,28 +240,17 @@ async def bulk_deactivate_monitors_endpoint(
 
     checked_ids_to_off = [monitor.id for monitor in monitors_to_set_status]
 
-    return await set_monitors_status_by_ids(db, checked_ids_to_off, is_active)
+    rows_affected = await set_monitors_status_by_ids(db, checked_ids_to_off, is_active)
+    await sync_monitors_schedule(db, MonitorModel.id.in_(checked_ids_to_off))
+    return rows_affected
 
 
 @router.patch("/{monitor_id}", response_model=MonitorRead)
 async def update_monitor_endpoint(
-    monitor_id: uuid.UUID,
     monitor_in: MonitorEdit,
     db: AsyncSession = Depends(get_async_db),
-    current_user: UserModel = Depends(get_current_user),
+    monitor: MonitorModel = Depends(get_owned_monitor),
 ) -> MonitorRead:
-    monitor_db = await get_monitor(db, monitor_id)
-
-    if not monitor_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    project_db = await get_project(db, monitor_db.project_id)
-
-    if not project_db or project_db.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
-        )
-
-    return await update_monitor(db, monitor_db, monitor_in)
+    monitor = await update_monitor(db, monitor, monitor_in)
+    await schedule_monitors([monitor])
+    return monitor
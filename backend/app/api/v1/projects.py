@@ -13,6 +13,7 @@ from app.crud.project import (
     update_project,
 )
 from app.db.session import get_async_db
+from app.models.monitor import Monitor as MonitorModel
 from app.models.project import Project as ProjectModel
 from app.models.user import User as UserModel
 from app.schemas.project import (
@@ -21,6 +22,7 @@ from app.schemas.project import (
     ProjectIdList,
     ProjectRead,
 )
+from app.services.schedule import sync_monitors_schedule
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -95,7 +97,9 @@ async def set_projects_status_by_id_endpoint(
 
     projects_to_set_ids = [project.id for project in projects_to_set]
 
-    return await set_projects_status_by_id(db, projects_to_set_ids, is_active)
+    rows_affected = await set_projects_status_by_id(db, projects_to_set_ids, is_active)
+    await sync_monitors_schedule(db, MonitorModel.project_id.in_(projects_to_set_ids))
+    return rows_affected
 
 
 @router.patch("/{project_id}", response_model=ProjectRead)
@@ -119,4 +123,7 @@ async def update_project_endpoint(
             detail="Only owner can edit project info",
         )
 
-    return await update_project(db, project_db, project_in)
+    project_db = await update_project(db, project_db, project_in)
+    if "is_active" in project_in.model_fields_set:
+        await sync_monitors_schedule(db, MonitorModel.project_id == project_db.id)
+    return project_db
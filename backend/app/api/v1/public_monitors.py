@@ -1,18 +1,20 @@
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import get_page_cursor, set_next_cursor
 from app.crud.check_result import get_checks_in_period
 from app.crud.public_monitor import (
     get_public_monitor,
     get_public_monitors_for_project,
 )
 from app.db.session import get_async_db
-from app.schemas.check_result import CheckResultRead
+from app.schemas.check_result import CheckResultRead, CheckSeries
 from app.schemas.monitor import MonitorStats
 from app.schemas.public_monitor import PublicMonitorRead
+from app.services.series import get_check_series, pick_bucket_sec
 from app.services.stats import compute_monitor_stats
 
 router = APIRouter(prefix="/public", tags=["public monitors"])
@@ -69,18 +71,37 @@ async def get_public_monitor_stats(
 
 @router.get(
     "/monitors/{monitor_id}/checks-history",
-    response_model=list[CheckResultRead],
+    response_model=list[CheckResultRead] | CheckSeries,
 )
 async def get_public_checks_result_endpoint(
     monitor_id: uuid.UUID,
+    response: Response,
     from_ts: datetime = Query(None, description="Start of checks(UTC)"),
     to_ts: datetime = Query(None, description="End of checks(UTC)"),
+    max_points: int | None = Query(
+        None, ge=1, description="Return bucketed series of at most N points"
+    ),
+    resolution: int | None = Query(
+        None, ge=1, description="Return bucketed series, bucket size in seconds"
+    ),
+    limit: int = Query(1000, ge=1, le=5000, description="Page size of raw checks"),
+    after: tuple[datetime, uuid.UUID] | None = Depends(get_page_cursor),
     db: AsyncSession = Depends(get_async_db),
-) -> list[CheckResultRead]:
+) -> list[CheckResultRead] | CheckSeries:
     monitor = await get_public_monitor(monitor_id, db)
     if not monitor:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Not found monitor"
         )
 
-    return await get_checks_in_period(db, monitor_id, from_ts, to_ts)
+    if max_points is not None or resolution is not None:
+        # series of default range - last 24 hours, like stats
+        to_ts = to_ts or datetime.now(timezone.utc)
+        from_ts = from_ts or to_ts - timedelta(hours=24)
+        bucket_sec = pick_bucket_sec(from_ts, to_ts, max_points, resolution)
+        return await get_check_series(db, monitor_id, from_ts, to_ts, bucket_sec)
+
+    # raw checks, oldest first, next page by cursor from X-Next-Cursor header
+    results = await get_checks_in_period(db, monitor_id, from_ts, to_ts, limit, after)
+    set_next_cursor(response, results, limit)
+    return list(results)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from app.core.deps import get_current_user
+from app.core.security import PasswordHashingOverloaded
 from app.crud.user import create_user, get_user, get_user_by_email, get_users
 from app.db.session import get_async_db
 from app.models.user import User
@@ -24,7 +25,13 @@ async def create_user_endpoint(
             detail="User with this email already exists",
         )
 
-    return await create_user(db, user_in)
+    try:
+        return await create_user(db, user_in)
+    except PasswordHashingOverloaded:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many requests, try again later",
+        )
 
 
 @router.get("/{user_id}", response_model=UserRead)
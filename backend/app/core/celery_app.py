@@ -24,8 +24,28 @@ celery_app.conf.update(
 celery_app.autodiscover_tasks(["app.tasks"])
 
 celery_app.conf.beat_schedule = {
-    "schedule-due-monitors-every-15s": {
+    "maintain-check-result-partitions-hourly": {
+        "task": "app.tasks.maintenance.maintain_check_result_partitions",
+        "schedule": 60.0 * 60,
+    },
+    "purge-expired-rollups-daily": {
+        "task": "app.tasks.maintenance.purge_expired_rollups_task",
+        "schedule": 24 * 60.0 * 60,
+    },
+    "verify-stats-cache-every-10m": {
+        "task": "app.tasks.maintenance.verify_stats_cache_task",
+        "schedule": 10 * 60.0,
+    },
+    "purge-expired-refresh-tokens-hourly": {
+        "task": "app.tasks.maintenance.purge_expired_refresh_tokens_task",
+        "schedule": 60.0 * 60,
+    },
+}
+
+if settings.scheduler_backend == "beat":
+    # `zset` / `runner` backends: due monitors are picked up by
+    # `python -m app.scheduler` / `python -m app.probe_runner`
+    celery_app.conf.beat_schedule["schedule-due-monitors-every-15s"] = {
         "task": "app.tasks.monitors.schedule_due_monitors",
-        "schedule": 15.0,
+        "schedule": settings.scheduler_beat_interval_sec,
     }
-}
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 ENV = os.getenv("ENVIRONMENT", "dev")
 
@@ -24,9 +25,73 @@ class Settings(BaseSettings):
     secret_key: str = Field(default="dev_key")
     jwt_algorithm: str = Field(default="HS256")
     access_token_expire_minutes: int = Field(default=30)
+    refresh_token_expire_days: int = 30
+    # stateless: user claims of the access token are trusted, no user lookup
+    auth_mode: Literal["db", "stateless"] = "db"
+    # Passwords, hashes of other kdf / lower cost are upgraded on login
+    password_kdf: Literal["bcrypt", "argon2"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_waiting: int = 100
     # Redis
     redis_url: AnyUrl = "redis://127.0.0.1:6379"
-    cache_ttl_monitor_stats_sec: int = 60
+    # sliding window of 24h stats lives while the monitor is checked
+    stats_cache_ttl_sec: int = 25 * 60 * 60
+    stats_cache_verify_sample: int = 20
+    # snapshot of the window read by dashboards, stale copy is served on refresh
+    stats_snapshot_ttl_sec: int = 10
+    stats_snapshot_stale_sec: int = 60
+    # past hour buckets of custom ranges don't change, kept until evicted
+    stats_bucket_cache_ttl_sec: int = 7 * 24 * 60 * 60
+    # in-process cache in front of Redis / db, per worker
+    local_cache_max_entries: int = 10_000
+    local_cache_stats_ttl_sec: float = 2.0
+    local_cache_user_ttl_sec: float = 30.0
+    local_cache_project_owner_ttl_sec: float = 300.0
+    # HTTP probes, http2 is negotiated with servers offering it when enabled
+    http_max_connections: int = 200
+    http_max_keepalive_connections: int = 50
+    http_keepalive_expiry_sec: float = 30.0
+    http_http2: bool = False
+    http_timeout_sec: float = 10.0
+    # Celery probes
+    celery_db_pool_size: int = 5
+    probe_batch_size: int = 100
+    probe_concurrency: int = 50
+    probe_per_host_concurrency: int = 5
+    result_writer_batch_size: int = 500
+    result_writer_flush_interval_sec: float = 1.0
+    # a monitor isn't dispatched again while its check is pending / running,
+    # the mark of a dead worker expires this long after its checks would be done
+    dispatch_inflight_margin_sec: int = 30
+    # asyncio probe runner, concurrency is capped by http_max_connections:
+    # requests waiting for a free connection of httpx pool burn cpu
+    probe_runner_concurrency: int = 1000
+    probe_runner_poll_sec: float = 1.0
+    probe_runner_db_pool_size: int = 10
+    probe_runner_shutdown_sec: float = 30.0
+    # Scheduler: `beat` polls db every 15s, `zset` - `python -m app.scheduler`
+    # (any number of instances) pops due monitors from Redis sorted sets,
+    # kept in sync by the api, `runner` - `python -m app.probe_runner` polls
+    # due monitors and checks them itself, no Celery
+    scheduler_backend: Literal["beat", "zset", "runner"] = "beat"
+    scheduler_beat_interval_sec: float = 15.0
+    # due monitors popped per slot and round-trip
+    scheduler_pop_limit: int = 1000
+    scheduler_max_sleep_sec: float = 1.0
+    scheduler_resync_interval_sec: int = 10 * 60
+    # instances heartbeat every lease / 3, slots of a silent one move on expiry
+    scheduler_lease_sec: float = 10.0
+    # check_results partitions
+    check_results_partition_interval: Literal["day", "week"] = "week"
+    check_results_partitions_ahead: int = 4
+    check_results_retention_days: int = 90
+    # check_results rollups (raw rows are used for the live window)
+    rollup_live_window_sec: int = 60 * 60
+    rollup_minute_retention_days: int = 7
+    rollup_hour_retention_days: int = 90
+    # checks-history series
+    series_max_points: int = 2000
     # Logging
     log_level: str = "INFO"
     log_json: bool = False
@@ -1,11 +1,16 @@
+import uuid
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from app.core.config import get_settings
-from app.core.security import decode_access_token
-from app.crud.user import get_user
+from app.core.security import get_access_token_payload
+from app.crud.monitor import get_monitor_for_owner
+from app.crud.user import get_user_cached
 from app.db.session import get_async_db
+from app.models.monitor import Monitor as MonitorModel
+from app.models.user import User as UserModel
 
 settings = get_settings()
 
@@ -18,7 +23,7 @@ async def get_current_user(
 ):
     # try to decode token
     try:
-        payload = decode_access_token(token)
+        payload = await get_access_token_payload(token)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,8 +37,40 @@ async def get_current_user(
             detail="Token missing 'sub'",
         )
 
-    # finding user
-    user = await get_user(db, user_id)
+    # stateless: user from claims, without email / dates.
+    # Tokens issued before the claims existed still go to the lookup
+    if settings.auth_mode == "stateless" and "is_active" in payload:
+        if not payload["is_active"]:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Inactive user",
+            )
+        return UserModel(
+            id=uuid.UUID(user_id),
+            is_active=payload["is_active"],
+            is_superuser=payload.get("is_superuser", False),
+        )
+
+    # finding user, hot users come from the worker's memory
+    user = await get_user_cached(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+        )
+
+    return user
+
+
+async def get_current_user_profile(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> UserModel:
+    """Current user with all fields, also in stateless auth mode"""
+    if current_user.email is not None:
+        return current_user
+
+    user = await get_user_cached(db, current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -41,3 +78,21 @@ async def get_current_user(
         )
 
     return user
+
+
+async def get_owned_monitor(
+    monitor_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> MonitorModel:
+    """
+    Monitor from path, which belongs to current user.
+    Other's monitors are not found, same as missing ones
+    """
+    monitor = await get_monitor_for_owner(db, monitor_id, current_user.id)
+    if not monitor:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Monitor not found"
+        )
+
+    return monitor
@@ -0,0 +1,43 @@
+import asyncio
+import weakref
+
+import httpx
+
+from app.core.config import get_settings
+
+# httpx-client is bound to the loop it was created in,
+# so one shared client is kept per event loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]"
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return shared pooled httpx-client for running event loop
+    """
+    loop = asyncio.get_running_loop()
+
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        settings = get_settings()
+        client = httpx.AsyncClient(
+            follow_redirects=True,
+            http2=settings.http_http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_sec,
+            ),
+        )
+        _clients[loop] = client
+
+    return client
+
+
+async def close_http_client() -> None:
+    """
+    Close shared httpx-client of running event loop (on shutdown)
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
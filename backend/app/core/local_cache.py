@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger("app.local_cache")
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+_caches: dict[str, "LocalCache"] = {}
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Bounded LRU with TTL in the memory of one worker process.
+    Keep immutable values / snapshots here, never session-bound ORM objects.
+    Entries dropped with `invalidate` are dropped in every worker
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_sec: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_sec = ttl_sec
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        _caches[name] = self
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            return default
+
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_sec: float | None = None) -> None:
+        """`ttl_sec` overrides TTL of the cache for this entry"""
+        ttl_sec = self.ttl_sec if ttl_sec is None else ttl_sec
+        self._data[key] = (time.monotonic() + ttl_sec, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def invalidate(self, key: str) -> None:
+        """Drop `key` here and in the other workers"""
+        self.delete(key)
+        try:
+            await get_redis_client().publish(
+                INVALIDATION_CHANNEL, json.dumps([self.name, key])
+            )
+        except RedisError as exc:
+            logger.warning(f"Failed to publish invalidation of {self.name}: {exc}")
+
+
+def _apply_invalidation(data: str) -> None:
+    name, key = json.loads(data)
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.delete(key)
+
+
+async def listen_for_invalidations() -> None:
+    """
+    Drop entries invalidated by other processes, runs for the app lifetime.
+    Messages may be lost while disconnected: everything is dropped on reconnect
+    """
+    while True:
+        try:
+            async with get_redis_client().pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                for cache in _caches.values():
+                    cache.clear()
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _apply_invalidation(message["data"])
+        except Exception as exc:
+            # a bad message or a dropped connection: resubscribe, caches start empty
+            logger.warning(f"Cache invalidation listener disconnected: {exc}")
+            await asyncio.sleep(1.0)
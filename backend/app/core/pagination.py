@@ -0,0 +1,50 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Sequence
+
+from fastapi import HTTPException, Query, Response, status
+
+# lists keep their body, the cursor of the next page goes to this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(checked_at: datetime, result_id: uuid.UUID) -> str:
+    """Opaque cursor of keyset pagination on (checked_at, id)"""
+    raw = json.dumps([checked_at.isoformat(), str(result_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Raises ValueError for broken cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        checked_at, result_id = json.loads(raw)
+        return datetime.fromisoformat(checked_at), uuid.UUID(result_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def get_page_cursor(
+    cursor: str | None = Query(
+        None, description=f"Cursor of the next page from {NEXT_CURSOR_HEADER} header"
+    ),
+) -> tuple[datetime, uuid.UUID] | None:
+    """Dependency: decoded `cursor` query parameter"""
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int) -> None:
+    """Full page - there may be more rows, point the client to them"""
+    if rows and len(rows) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            rows[-1].checked_at, rows[-1].id
+        )
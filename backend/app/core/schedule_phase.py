@@ -0,0 +1,22 @@
+import hashlib
+import math
+import uuid
+from datetime import datetime, timezone
+
+
+def phase_offset_sec(monitor_id: uuid.UUID, interval_sec: int) -> float:
+    """
+    Deterministic offset of the monitor's runs inside its interval (ms precision),
+    spreads monitors with the same interval evenly instead of firing together
+    """
+    digest = hashlib.sha256(monitor_id.bytes).digest()
+    return int.from_bytes(digest[:8], "big") % (interval_sec * 1000) / 1000
+
+
+def next_phase_run(
+    monitor_id: uuid.UUID, interval_sec: int, after: datetime
+) -> datetime:
+    """First run of the monitor's phase strictly after `after`"""
+    offset = phase_offset_sec(monitor_id, interval_sec)
+    runs = math.floor((after.timestamp() - offset) / interval_sec) + 1
+    return datetime.fromtimestamp(offset + runs * interval_sec, tz=timezone.utc)
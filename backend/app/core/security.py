@@ -1,24 +1,57 @@
+import asyncio
+import hashlib
+import logging
 import secrets
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import UTC
 from datetime import datetime as dt
 from datetime import timedelta
+from typing import cast
 
 from fastapi import Depends
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
+from redis.exceptions import RedisError
+from sqlalchemy import Row, delete, update
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm.session import Session
 
 from app.core.config import get_settings
+from app.core.local_cache import LocalCache
+from app.core.redis_client import get_redis_client
 from app.db.session import get_async_db
-from app.models import RefreshToken
+from app.models import RefreshToken, User
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger("app.security")
+
+
+def _build_pwd_context() -> CryptContext:
+    settings = get_settings()
+    schemes = ["argon2", "bcrypt"] if settings.password_kdf == "argon2" else ["bcrypt"]
+    # hashes of non-default schemes / with less rounds need an update
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+    )
+
+
+pwd_context = _build_pwd_context()
+
+# decoded and checked access tokens, every entry lives as long as its token
+access_tokens_cache = LocalCache(
+    "access_tokens", get_settings().local_cache_max_entries, ttl_sec=0
+)
 
 
 def hash_password(password: str) -> str:
+    """Blocking, async code goes through `password_hasher`"""
     return pwd_context.hash(password)
 
 
@@ -29,6 +62,78 @@ def verify_password(password: str, hashed: str) -> bool:
         return False
 
 
+class PasswordHashingOverloaded(Exception):
+    """Too many password hashes are waiting for a worker thread"""
+
+
+@dataclass
+class PasswordHashingMetrics:
+    calls: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+class PasswordHasher:
+    """
+    Runs the KDF in a bounded thread pool, the event loop isn't blocked
+    for ~200ms of every hash. Beyond `max_waiting` queued calls new ones
+    are rejected instead of piling up
+    """
+
+    def __init__(self, max_workers: int, max_waiting: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._max_workers = max_workers
+        self._max_waiting = max_waiting
+        self.metrics = PasswordHashingMetrics()
+
+    async def _run(self, fn, *args):
+        metrics = self.metrics
+        if metrics.in_flight >= self._max_workers + self._max_waiting:
+            metrics.rejected += 1
+            raise PasswordHashingOverloaded()
+
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, fn, *args
+            )
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            metrics.in_flight -= 1
+            metrics.calls += 1
+            metrics.total_ms += elapsed_ms
+            metrics.max_ms = max(metrics.max_ms, elapsed_ms)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed: str
+    ) -> tuple[bool, str | None]:
+        """(verified, new hash if the stored one must be upgraded)"""
+        try:
+            return await self._run(pwd_context.verify_and_update, password, hashed)
+        except (UnknownHashError, ValueError):
+            return False, None
+
+    def snapshot(self) -> dict:
+        data = asdict(self.metrics)
+        data["waiting"] = max(self.metrics.in_flight - self._max_workers, 0)
+        data["avg_ms"] = data["total_ms"] / data["calls"] if data["calls"] else None
+        return data
+
+
+password_hasher = PasswordHasher(
+    max_workers=get_settings().password_hash_workers,
+    max_waiting=get_settings().password_hash_max_waiting,
+)
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     settings = get_settings()
     to_encode = data.copy()
@@ -44,6 +149,16 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return encoded_jwt
 
 
+def user_token_claims(user) -> dict:
+    """Claims of access token, enough to authorize without a user lookup"""
+    return {
+        "sub": str(user.id),
+        "jti": uuid.uuid4().hex,
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+    }
+
+
 def decode_access_token(token: str) -> dict:
     settings = get_settings()
 
@@ -58,6 +173,62 @@ def decode_access_token(token: str) -> dict:
         raise ValueError("Invalid or expired token")
 
 
+def _revoked_token_key(jti: str) -> str:
+    return f"auth:revoked:{jti}"
+
+
+def _token_cache_key(token: str) -> str:
+    # tokens themselves never go to the invalidation channel
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def get_access_token_payload(token: str) -> dict:
+    """
+    Payload of valid, not revoked access token.
+    Decoded once per token and worker, then served from memory until it expires.
+    Raises ValueError for invalid, expired or revoked token
+    """
+    cache_key = _token_cache_key(token)
+    payload = access_tokens_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
+    payload = decode_access_token(token)
+
+    jti = payload.get("jti")
+    if jti:
+        try:
+            revoked = await get_redis_client().exists(_revoked_token_key(jti))
+        except RedisError as exc:
+            # fail open, but check again on the next request
+            logger.warning(f"Revocation list is unavailable: {exc}")
+            return payload
+        if revoked:
+            raise ValueError("Token revoked")
+
+    access_tokens_cache.set(cache_key, payload, ttl_sec=payload["exp"] - time.time())
+    return payload
+
+
+async def revoke_access_token(token: str) -> None:
+    """
+    Put token to the revocation list until it expires
+    and drop it from memory of every worker
+    """
+    payload = decode_access_token(token)
+    jti = payload.get("jti")
+    if not jti:
+        raise ValueError("Token can't be revoked")
+
+    ttl_sec = max(int(payload["exp"] - time.time()), 1)
+    await get_redis_client().set(_revoked_token_key(jti), 1, ex=ttl_sec)
+    await access_tokens_cache.invalidate(_token_cache_key(token))
+
+
+def _refresh_token_expires_at() -> dt:
+    return dt.now(UTC) + timedelta(days=get_settings().refresh_token_expire_days)
+
+
 async def create_refresh_token(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -65,7 +236,9 @@ async def create_refresh_token(
 ) -> str:
     token_str = secrets.token_urlsafe(32)
 
-    expire = dt.now(UTC) + (expires_delta or timedelta(days=30))
+    expire = (
+        dt.now(UTC) + expires_delta if expires_delta else _refresh_token_expires_at()
+    )
 
     db_token = RefreshToken(token=token_str, expires_at=expire, user_id=user_id)
 
@@ -73,3 +246,46 @@ async def create_refresh_token(
     await db.commit()
 
     return token_str
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> tuple[str, Row] | None:
+    """
+    Swap a live refresh token for a new one in place, one UPDATE ... RETURNING.
+    Returns new token and (id, is_active, is_superuser) of its user,
+    None if token is unknown, expired or already rotated
+    """
+    new_token = secrets.token_urlsafe(32)
+    now = dt.now(UTC)
+
+    user = (
+        await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token == token,
+                RefreshToken.expires_at > now,
+                RefreshToken.user_id == User.id,
+            )
+            .values(
+                token=new_token,
+                expires_at=_refresh_token_expires_at(),
+                created_at=now,
+            )
+            .returning(User.id, User.is_active, User.is_superuser)
+            .execution_options(synchronize_session=False)
+        )
+    ).first()
+    await db.commit()
+
+    if user is None:
+        return None
+    return new_token, user
+
+
+async def delete_expired_refresh_tokens(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= dt.now(UTC))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return cast(CursorResult, result).rowcount
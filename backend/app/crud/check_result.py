@@ -2,43 +2,55 @@ import uuid
 from datetime import datetime
 from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import insert, select, tuple_
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
 from app.models.check_result import CheckResult as CheckResultModel
 
 
-async def create_check_result(
+async def create_check_results(
     db: AsyncSession,
-    monitor_id: uuid.UUID,
-    is_up: bool,
-    status_code: int | None,
-    response_time_ms: int | None,
-    error_message: str | None,
-) -> CheckResultModel:
-    result = CheckResultModel(
-        monitor_id=monitor_id,
-        is_up=is_up,
-        status_code=status_code,
-        response_time_ms=response_time_ms,
-        error_message=error_message,
-    )
-    db.add(result)
+    rows: list[dict],
+) -> Sequence[CheckResultModel]:
+    """
+    Insert many results with multi-row INSERT ... RETURNING, one commit
+    """
+    if not rows:
+        return []
+
+    results = (
+        await db.scalars(
+            insert(CheckResultModel).returning(
+                CheckResultModel, sort_by_parameter_order=True
+            ),
+            rows,
+        )
+    ).all()
     await db.commit()
-    await db.refresh(result)
-    return result
+    return results
 
 
 async def get_recent_results_for_monitor(
     db: AsyncSession,
     monitor_id: uuid.UUID,
     limit: int = 20,
+    before: tuple[datetime, uuid.UUID] | None = None,
 ) -> Sequence[CheckResultModel]:
+    """
+    Newest first. `before` - (checked_at, id) of the last row of previous page
+    """
+    stmt = select(CheckResultModel).where(CheckResultModel.monitor_id == monitor_id)
+    if before is not None:
+        # row comparison in the order of the index: one range scan
+        stmt = stmt.where(
+            tuple_(CheckResultModel.checked_at, CheckResultModel.id) < tuple_(*before)
+        )
+
     return (
         await db.scalars(
-            select(CheckResultModel)
-            .where(CheckResultModel.monitor_id == monitor_id)
-            .limit(limit)
+            stmt.order_by(
+                CheckResultModel.checked_at.desc(), CheckResultModel.id.desc()
+            ).limit(limit)
         )
     ).all()
 
@@ -46,17 +58,28 @@ async def get_recent_results_for_monitor(
 async def get_checks_in_period(
     db: AsyncSession,
     monitor_id: uuid.UUID,
-    from_ts: datetime,
-    to_ts: datetime,
+    from_ts: datetime | None,
+    to_ts: datetime | None,
+    limit: int | None = None,
+    after: tuple[datetime, uuid.UUID] | None = None,
 ) -> Sequence[CheckResultModel]:
+    """
+    Oldest first. `after` - (checked_at, id) of the last row of previous page
+    """
+    stmt = select(CheckResultModel).where(CheckResultModel.monitor_id == monitor_id)
+    if from_ts is not None:
+        stmt = stmt.where(CheckResultModel.checked_at >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.where(CheckResultModel.checked_at <= to_ts)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(CheckResultModel.checked_at, CheckResultModel.id) > tuple_(*after)
+        )
+
     return (
         await db.scalars(
-            select(CheckResultModel)
-            .where(
-                CheckResultModel.monitor_id == monitor_id,
-                CheckResultModel.checked_at >= from_ts,
-                CheckResultModel.checked_at <= to_ts,
-            )
-            .order_by(CheckResultModel.checked_at.asc())
+            stmt.order_by(
+                CheckResultModel.checked_at.asc(), CheckResultModel.id.asc()
+            ).limit(limit)
         )
     ).all()
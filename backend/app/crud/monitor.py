@@ -1,11 +1,21 @@
 import uuid
 from datetime import datetime, timezone
-from typing import Sequence, cast
+from typing import Sequence
 
-from sqlalchemy import select, update
-from sqlalchemy.engine import CursorResult
+from sqlalchemy import (
+    DateTime,
+    Row,
+    column,
+    func,
+    literal_column,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
+from app.core.schedule_phase import next_phase_run
 from app.models.monitor import Monitor as MonitorModel
 from app.models.project import Project as ProjectModel
 from app.schemas.monitor import MonitorCreate, MonitorEdit
@@ -16,12 +26,17 @@ async def create_monitor(
     project: ProjectModel,
     monitor_in: MonitorCreate,
 ) -> MonitorModel:
+    monitor_id = uuid.uuid4()
     monitor = MonitorModel(
+        id=monitor_id,
         project_id=project.id,
         name=monitor_in.name,
         target_url=str(monitor_in.target_url),
         check_interval_sec=monitor_in.check_interval_sec,
         is_active=monitor_in.is_active,
+        next_check_at=next_phase_run(
+            monitor_id, monitor_in.check_interval_sec, datetime.now(timezone.utc)
+        ),
     )
     db.add(monitor)
     await db.commit()
@@ -36,6 +51,34 @@ async def get_monitor(
     return await db.scalar(select(MonitorModel).where(MonitorModel.id == monitor_id))
 
 
+async def get_random_active_monitor_ids(
+    db: AsyncSession,
+    limit: int,
+) -> Sequence[uuid.UUID]:
+    return (
+        await db.scalars(
+            select(MonitorModel.id)
+            .where(MonitorModel.is_active)
+            .order_by(func.random())
+            .limit(limit)
+        )
+    ).all()
+
+
+async def get_active_monitors_by_ids(
+    db: AsyncSession,
+    monitor_ids: list[uuid.UUID],
+) -> Sequence[MonitorModel]:
+    return (
+        await db.scalars(
+            select(MonitorModel).where(
+                MonitorModel.id.in_(monitor_ids),
+                MonitorModel.is_active.is_(True),
+            )
+        )
+    ).all()
+
+
 async def get_monitors_for_project(
     db: AsyncSession,
     project_id: uuid.UUID,
@@ -52,6 +95,81 @@ async def get_monitors_for_project(
     ).all()
 
 
+async def get_due_monitor_runs(
+    db: AsyncSession,
+    now: datetime,
+    limit: int | None = None,
+) -> Sequence[Row[tuple[uuid.UUID, datetime]]]:
+    """
+    (id, next_check_at) of active monitors due by `now`,
+    earliest first, at most `limit` of them.
+    Range scan over partial index ix_monitors_next_check_at_active
+    """
+    return (
+        await db.execute(
+            select(MonitorModel.id, MonitorModel.next_check_at)
+            .where(
+                # same predicate as the partial index, so the planner can use it
+                MonitorModel.is_active,
+                MonitorModel.next_check_at <= now,
+            )
+            .order_by(MonitorModel.next_check_at)
+            .limit(limit)
+        )
+    ).all()
+
+
+async def advance_monitors_schedule(
+    db: AsyncSession,
+    checked_at_by_monitor: dict[uuid.UUID, datetime],
+) -> None:
+    """
+    Move monitors to their next run after checks at given time, one UPDATE.
+    The next run keeps the phase of the current one, so late checks don't drift.
+    Doesn't commit: must be a part of the transaction, which writes the results
+    """
+    if not checked_at_by_monitor:
+        return
+
+    checks = values(
+        column("monitor_id", UUID(as_uuid=True)),
+        column("checked_at", DateTime(timezone=True)),
+        name="checks",
+    ).data(list(checked_at_by_monitor.items()))
+
+    interval = MonitorModel.check_interval_sec
+    missed_runs = func.floor(
+        func.extract("epoch", checks.c.checked_at - MonitorModel.next_check_at)
+        / interval
+    )
+    await db.execute(
+        update(MonitorModel)
+        .where(MonitorModel.id == checks.c.monitor_id)
+        .values(
+            last_checked_at=checks.c.checked_at,
+            next_check_at=MonitorModel.next_check_at
+            + (missed_runs + 1) * interval * literal_column("INTERVAL '1 second'"),
+            # a check is not an edit of the monitor
+            updated_at=MonitorModel.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_monitor_for_owner(
+    db: AsyncSession, monitor_id: uuid.UUID, user_id: uuid.UUID
+) -> MonitorModel | None:
+    """Monitor and ownership of its project in one query"""
+    return await db.scalar(
+        select(MonitorModel)
+        .join(ProjectModel, MonitorModel.project_id == ProjectModel.id)
+        .where(
+            MonitorModel.id == monitor_id,
+            ProjectModel.owner_id == user_id,
+        )
+    )
+
+
 async def get_monitors_for_owner_by_ids(
     db: AsyncSession, monitor_ids: list[uuid.UUID], user_id: uuid.UUID
 ) -> Sequence[MonitorModel]:
@@ -67,18 +185,68 @@ async def get_monitors_for_owner_by_ids(
     ).all()
 
 
+async def set_next_check_at_by_phase(
+    db: AsyncSession,
+    monitors: Sequence[tuple[uuid.UUID, int]],
+    after: datetime,
+) -> None:
+    """
+    Put (id, check_interval_sec) monitors to the next run of their phase,
+    one UPDATE. Doesn't commit
+    """
+    if not monitors:
+        return
+
+    runs = values(
+        column("monitor_id", UUID(as_uuid=True)),
+        column("next_check_at", DateTime(timezone=True)),
+        name="runs",
+    ).data(
+        [
+            (monitor_id, next_phase_run(monitor_id, interval_sec, after))
+            for monitor_id, interval_sec in monitors
+        ]
+    )
+
+    await db.execute(
+        update(MonitorModel)
+        .where(MonitorModel.id == runs.c.monitor_id)
+        .values(next_check_at=runs.c.next_check_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def switch_monitors_status(db: AsyncSession, is_active: bool, *criteria) -> int:
+    """
+    Switch monitors matching `criteria`, re-activated ones are due
+    at the next run of their phase, not all at once. Doesn't commit
+    """
+    current_time = datetime.now(timezone.utc)
+
+    switched = (
+        await db.execute(
+            update(MonitorModel)
+            .where(*criteria, MonitorModel.is_active.is_(not is_active))
+            .values(is_active=is_active, updated_at=current_time)
+            .returning(MonitorModel.id, MonitorModel.check_interval_sec)
+            .execution_options(synchronize_session=False)
+        )
+    ).all()
+
+    if is_active:
+        await set_next_check_at_by_phase(
+            db, [(row.id, row.check_interval_sec) for row in switched], current_time
+        )
+
+    return len(switched)
+
+
 async def set_monitors_status_by_ids(
     db: AsyncSession, monitor_ids: list[uuid.UUID], is_active: bool
 ):
-    result = await db.execute(
-        update(MonitorModel)
-        .where(
-            MonitorModel.id.in_(monitor_ids),
-            MonitorModel.is_active.is_(not is_active),
-        )
-        .values(is_active=is_active, updated_at=datetime.now(timezone.utc))
+    rows_affected = await switch_monitors_status(
+        db, is_active, MonitorModel.id.in_(monitor_ids)
     )
-    rows_affected = cast(CursorResult, result).rowcount
 
     if is_active:
         _ = await db.execute(
@@ -104,13 +272,29 @@ async def update_monitor(
     if not update_data:
         return monitor_db
 
+    was_active = monitor_db.is_active
+    old_interval = monitor_db.check_interval_sec
+
     for field, value in update_data.items():
         if field == "target_url" and value is not None:
             value = str(value)
 
         setattr(monitor_db, field, value)
 
-    monitor_db.updated_at = datetime.now(timezone.utc)
+    current_time = datetime.now(timezone.utc)
+    monitor_db.updated_at = current_time
+
+    # reset position in the due-queue, at the phase of the monitor
+    if monitor_db.is_active and not was_active:
+        monitor_db.next_check_at = next_phase_run(
+            monitor_db.id, monitor_db.check_interval_sec, current_time
+        )
+    elif monitor_db.check_interval_sec != old_interval:
+        monitor_db.next_check_at = next_phase_run(
+            monitor_db.id,
+            monitor_db.check_interval_sec,
+            monitor_db.last_checked_at or current_time,
+        )
 
     db.add(monitor_db)
     await db.commit()
@@ -6,14 +6,22 @@ from sqlalchemy import select, update
 from sqlalchemy.engine.cursor import CursorResult
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from app.crud.monitor import (
-    get_monitors_for_project,
-    set_monitors_status_by_ids,
-)
+from app.core.config import get_settings
+from app.core.local_cache import LocalCache
+from app.crud.monitor import switch_monitors_status
 from app.models import Monitor as MonitorModel
 from app.models import Project as ProjectModel
 from app.models.user import User as UserModel
-from app.schemas.project import ProjectCreate, ProjectEdit, ProjectRead
+from app.schemas.project import ProjectCreate, ProjectEdit
+
+settings = get_settings()
+
+# owner of project for authorization, dropped in every worker when the project changes
+project_owners_cache = LocalCache(
+    "project_owners",
+    settings.local_cache_max_entries,
+    settings.local_cache_project_owner_ttl_sec,
+)
 
 
 async def create_project(
@@ -43,6 +51,20 @@ async def get_project(db: AsyncSession, project_id: uuid.UUID) -> ProjectModel |
     ).first()
 
 
+async def get_project_owner_id(
+    db: AsyncSession, project_id: uuid.UUID
+) -> uuid.UUID | None:
+    """Owner of project for authorization, cached per worker"""
+    owner_id = project_owners_cache.get(str(project_id))
+    if owner_id is None:
+        owner_id = await db.scalar(
+            select(ProjectModel.owner_id).where(ProjectModel.id == project_id)
+        )
+        if owner_id is not None:
+            project_owners_cache.set(str(project_id), owner_id)
+    return owner_id
+
+
 async def get_projects_for_user(
     db: AsyncSession,
     owner_id: uuid.UUID,
@@ -87,14 +109,16 @@ async def set_projects_status_by_id(
     )
     rows_affected = cast(CursorResult, result).rowcount
 
-    await db.execute(
-        update(MonitorModel)
-        .where(MonitorModel.project_id.in_(projects_ids))
-        .values(is_active=is_active, updated_at=current_time)
+    await switch_monitors_status(
+        db, is_active, MonitorModel.project_id.in_(projects_ids)
     )
 
     await db.commit()
 
+    if rows_affected:
+        for project_id in projects_ids:
+            await project_owners_cache.invalidate(str(project_id))
+
     return rows_affected
 
 
@@ -107,13 +131,8 @@ async def update_project(
         return project_db
 
     if "is_active" in update_data:
-        new_status = update_data["is_active"]
-        current_time = datetime.now(timezone.utc)
-
-        await db.execute(
-            update(MonitorModel)
-            .where(MonitorModel.project_id == project_db.id)
-            .values(is_active=new_status, updated_at=current_time)
+        await switch_monitors_status(
+            db, update_data["is_active"], MonitorModel.project_id == project_db.id
         )
 
     for field, value in update_data.items():
@@ -123,6 +142,7 @@ async def update_project(
 
     db.add(project_db)
     await db.commit()
+    await project_owners_cache.invalidate(str(project_db.id))
     await db.refresh(project_db)
 
     return project_db
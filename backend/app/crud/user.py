@@ -1,18 +1,45 @@
 import uuid
 from typing import Sequence
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio.session import AsyncSession
 
-from app.core.security import hash_password
+from app.core.config import get_settings
+from app.core.local_cache import LocalCache
+from app.core.security import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate
 
+settings = get_settings()
+
+# column values of users, a new User is built from them for every hit
+users_cache = LocalCache(
+    "users", settings.local_cache_max_entries, settings.local_cache_user_ttl_sec
+)
+
 
 async def get_user(db: AsyncSession, user_id: uuid.UUID) -> User | None:
     return (await db.scalars(select(User).where(User.id == user_id))).first()
 
 
+async def get_user_cached(db: AsyncSession, user_id: uuid.UUID) -> User | None:
+    """
+    get_user through the per-worker cache.
+    A hit is a transient User, not attached to any session
+    """
+    values = users_cache.get(str(user_id))
+    if values is not None:
+        return User(**values)
+
+    user = await get_user(db, user_id)
+    if user is not None:
+        users_cache.set(
+            str(user_id),
+            {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs},
+        )
+    return user
+
+
 async def get_user_by_email(db: AsyncSession, user_email: str) -> User | None:
     return (await db.scalars(select(User).where(User.email == user_email))).first()
 
@@ -24,7 +51,7 @@ async def get_users(
 
 
 async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
-    hashed = hash_password(user_in.password)
+    hashed = await password_hasher.hash(user_in.password)
 
     user = User(
         email=user_in.email,
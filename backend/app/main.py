@@ -1,3 +1,5 @@
+import asyncio
+import contextlib
 import logging
 from contextlib import asynccontextmanager
 
@@ -12,7 +14,10 @@ from app.api.v1.public_monitors import router as public_monitors_router
 from app.api.v1.public_projects import router as public_projects_router
 from app.api.v1.users import router as users_router
 from app.core.config import get_settings
+from app.core.http_client import close_http_client
+from app.core.local_cache import listen_for_invalidations
 from app.core.logging import setup_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 
 def create_app() -> FastAPI:
@@ -25,11 +30,16 @@ def create_app() -> FastAPI:
     async def lifespan(app: FastAPI):
         # startup ----
         logger.info("Starting %s in %s", settings.app_name, settings.environment)
+        invalidation_listener = asyncio.create_task(listen_for_invalidations())
 
         yield
 
         # shutdown ---
         logger.info("Shutting down %s", settings.app_name)
+        invalidation_listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await invalidation_listener
+        await close_http_client()
 
     app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
 
@@ -44,6 +54,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     app.include_router(health_router, prefix=settings.api_v1_prefix)
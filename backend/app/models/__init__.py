@@ -1,5 +1,6 @@
 from app.db.base import Base  # noqa
 from app.models.check_result import CheckResult  # noqa
+from app.models.check_result_rollup import CheckResultRollup  # noqa
 from app.models.monitor import Monitor  # noqa
 from app.models.project import Project  # noqa
 from app.models.refresh_tokens import RefreshToken  # noqa
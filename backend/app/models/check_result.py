@@ -1,7 +1,7 @@
 import datetime as dt
 import uuid
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import DDL, Boolean, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -11,6 +11,8 @@ from app.db.base import Base
 
 class CheckResult(Base):
     __tablename__ = "check_results"
+    # partitions are created / dropped by app.services.partitions
+    __table_args__ = {"postgresql_partition_by": "RANGE (checked_at)"}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -19,10 +21,13 @@ class CheckResult(Base):
         UUID(as_uuid=True),
         ForeignKey("monitors.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
+    # partition key must be a part of primary key
     checked_at: Mapped[dt.datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
     )
     is_up: Mapped[bool] = mapped_column(Boolean, nullable=False)
     status_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
@@ -30,3 +35,25 @@ class CheckResult(Base):
     error_message: Mapped[str | None] = mapped_column(String(1000), nullable=True)
 
     monitor: Mapped["Monitor"] = relationship(back_populates="check_results")
+
+
+# every hot query filters by monitor and ranges / sorts by time, id breaks
+# ties of keyset pages; included columns let stats aggregates run as
+# index-only scans
+Index(
+    "ix_check_results_monitor_id_checked_at",
+    CheckResult.monitor_id,
+    CheckResult.checked_at.desc(),
+    CheckResult.id.desc(),
+    postgresql_include=["is_up", "response_time_ms", "status_code"],
+)
+
+# catches rows outside of created partitions, normally stays empty
+event.listen(
+    CheckResult.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE IF NOT EXISTS check_results_default "
+        "PARTITION OF check_results DEFAULT"
+    ),
+)
@@ -0,0 +1,36 @@
+import datetime as dt
+import uuid
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CheckResultRollup(Base):
+    """
+    Pre-aggregated checks of a monitor per 1m / 1h / 1d bucket
+    """
+
+    __tablename__ = "check_result_rollups"
+
+    monitor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("monitors.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    bucket_sec: Mapped[int] = mapped_column(Integer, primary_key=True)
+    bucket_start: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    total_checks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    up_checks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    response_time_sum: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+    response_time_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    response_time_min: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    response_time_max: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # percentile sketch: counts per app.services.rollups.LATENCY_BUCKETS_MS
+    latency_histogram: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
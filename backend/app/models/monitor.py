@@ -1,7 +1,7 @@
 import datetime as dt
 import uuid
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -12,6 +12,14 @@ from app.models.project import Project
 
 class Monitor(Base):
     __tablename__ = "monitors"
+    __table_args__ = (
+        # due-queue for the scheduler: range scan over active monitors only
+        Index(
+            "ix_monitors_next_check_at_active",
+            "next_check_at",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -35,7 +43,12 @@ class Monitor(Base):
         server_default=func.now(),
         onupdate=func.now(),
     )
-
+    last_checked_at: Mapped[dt.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    next_check_at: Mapped[dt.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
 
     project: Mapped["Project"] = relationship(back_populates="monitors")
     check_results: Mapped[list["CheckResult"]] = relationship(
@@ -0,0 +1,177 @@
+"""
+Probe runner of the `runner` scheduler backend, instead of beat + Celery
+prefork workers: one long-lived event loop polls due monitors from Postgres,
+runs their checks concurrently with the pooled http-client and db engine and
+writes results in bulk.
+
+Any number of runners can poll the same db: a due monitor is claimed by one
+runner with its in-flight mark and released once its result is written.
+
+    SCHEDULER_BACKEND=runner python -m app.probe_runner
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import get_settings
+from app.core.http_client import close_http_client
+from app.core.logging import setup_logging
+from app.core.redis_client import get_redis_client
+from app.crud.monitor import get_active_monitors_by_ids, get_due_monitor_runs
+from app.models.monitor import Monitor as MonitorModel
+from app.services.dispatch import (
+    claim_dispatch,
+    inflight_ttl_sec,
+    new_dispatch_token,
+    release_dispatch,
+)
+from app.services.monitoring import ProbePool
+from app.services.result_writer import CheckResultWriter, PendingCheckResult
+
+logger = logging.getLogger("app.probe_runner")
+
+settings = get_settings()
+
+# pool lives as long as the runner, shared by polls and result writes
+runner_engine = create_async_engine(
+    settings.database_url,
+    pool_size=settings.probe_runner_db_pool_size,
+    pool_pre_ping=True,
+)
+runner_session_maker = async_sessionmaker(bind=runner_engine, expire_on_commit=False)
+
+
+class ProbeRunner:
+    def __init__(self):
+        self.settings = settings
+        self.concurrency = min(
+            settings.probe_runner_concurrency, settings.http_max_connections
+        )
+        self.pool = ProbePool(self.concurrency, settings.probe_per_host_concurrency)
+        self.writer = CheckResultWriter(
+            runner_session_maker,
+            max_batch=settings.result_writer_batch_size,
+            flush_interval_sec=settings.result_writer_flush_interval_sec,
+            on_flushed=self._release_results,
+            on_dropped=self._release_results,
+        )
+        # monitor -> token of its claim, until its result is written or dropped
+        self.inflight: dict[str, str] = {}
+        self.probes: set[asyncio.Task] = set()
+
+    async def _release(self, monitor_ids: set[str]) -> None:
+        by_token: dict[str, list[str]] = {}
+        for monitor_id in monitor_ids:
+            token = self.inflight.pop(monitor_id, None)
+            if token is not None:
+                by_token.setdefault(token, []).append(monitor_id)
+        for token, claimed in by_token.items():
+            await release_dispatch(get_redis_client(), claimed, token)
+
+    async def _release_results(self, batch: Sequence[PendingCheckResult]) -> None:
+        # a dropped result leaves its run due: it is checked again
+        await self._release({str(item.monitor_id) for item in batch})
+
+    async def _probe(self, monitor: MonitorModel) -> None:
+        try:
+            await self.pool.probe(monitor, self.writer)
+        except Exception as exc:
+            # no result was buffered: once one is, the claim is released
+            # only after it's written
+            logger.error(f"Check of monitor {monitor.id} failed: {exc}")
+            await self._release({str(monitor.id)})
+
+    async def poll(self) -> int:
+        """Start checks of due monitors, returns number of started checks"""
+        # don't take more than the pool can run, the rest stays due
+        capacity = self.concurrency * 2 - len(self.probes)
+        if capacity <= 0:
+            return 0
+
+        # claimed monitors stay due until their results are written
+        async with runner_session_maker() as db:
+            due_runs = await get_due_monitor_runs(
+                db, datetime.now(timezone.utc), limit=capacity + len(self.inflight)
+            )
+        due_ids = [
+            str(monitor_id)
+            for monitor_id, _ in due_runs
+            if str(monitor_id) not in self.inflight
+        ][:capacity]
+
+        # started checks are ahead of these in the pool
+        token = new_dispatch_token()
+        claimed = await claim_dispatch(
+            get_redis_client(),
+            due_ids,
+            inflight_ttl_sec(len(self.probes) + len(due_ids), self.concurrency),
+            token,
+        )
+        if not claimed:
+            return 0
+        self.inflight.update(dict.fromkeys(claimed, token))
+
+        async with runner_session_maker() as db:
+            monitors = await get_active_monitors_by_ids(
+                db, [uuid.UUID(monitor_id) for monitor_id in claimed]
+            )
+        # switched off meanwhile
+        gone = set(claimed) - {str(monitor.id) for monitor in monitors}
+        if gone:
+            await self._release(gone)
+
+        for monitor in monitors:
+            task = asyncio.create_task(self._probe(monitor))
+            self.probes.add(task)
+            task.add_done_callback(self.probes.discard)
+        return len(monitors)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self.writer.start()
+        try:
+            while not stop.is_set():
+                try:
+                    await self.poll()
+                except Exception as exc:
+                    logger.error(f"Failed to poll due monitors: {exc}")
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        stop.wait(), timeout=self.settings.probe_runner_poll_sec
+                    )
+        finally:
+            # let started checks finish, their results are written on close
+            if self.probes:
+                await asyncio.wait(
+                    self.probes, timeout=self.settings.probe_runner_shutdown_sec
+                )
+            await self.writer.close()
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Probe runner started")
+    try:
+        await ProbeRunner().run(stop)
+    finally:
+        await close_http_client()
+        await get_redis_client().aclose()
+        await runner_engine.dispose()
+        logger.info("Probe runner stopped")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    if settings.scheduler_backend != "runner":
+        raise SystemExit("Set SCHEDULER_BACKEND=runner, Celery checks monitors now")
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Scheduler of the `zset` backend, replaces the 15s beat poll:
+due monitors are popped from the Redis timing wheel as soon as they are due
+and dispatched to Celery workers.
+
+Any number of instances can run against one Redis: slots of the wheel are
+shared out between live instances and rebalanced when one joins or its lease
+expires. The leader, elected by a Redis lease, resyncs the wheel from Postgres
+when it takes over and every `scheduler_resync_interval_sec`.
+
+    SCHEDULER_BACKEND=zset python -m app.scheduler
+"""
+
+import asyncio
+import contextlib
+import logging
+import signal
+import time
+
+from app.core.config import get_settings
+from app.core.logging import setup_logging
+from app.core.redis_client import get_redis_client
+from app.db.session import async_engine, async_session_maker
+from app.services.dispatch import (
+    claim_dispatch,
+    inflight_ttl_sec,
+    new_dispatch_token,
+)
+from app.services.schedule import (
+    get_next_run_at,
+    pop_due_monitor_ids,
+    rebuild_schedule,
+)
+from app.services.scheduler_membership import SchedulerMembership
+from app.tasks.monitors import run_monitor_checks_batch
+
+logger = logging.getLogger("app.scheduler")
+
+
+async def resync_schedule() -> None:
+    async with async_session_maker() as db:
+        scheduled = await rebuild_schedule(db, get_redis_client())
+    logger.info("Schedule resynced from db, %s active monitors", scheduled)
+
+
+async def dispatch(monitor_ids: list[str]) -> None:
+    """Monitors with a pending / running check skip this run"""
+    settings = get_settings()
+    token = new_dispatch_token()
+    monitor_ids = await claim_dispatch(
+        get_redis_client(),
+        monitor_ids,
+        inflight_ttl_sec(settings.probe_batch_size, settings.probe_concurrency),
+        token,
+    )
+    batch_size = settings.probe_batch_size
+    for i in range(0, len(monitor_ids), batch_size):
+        run_monitor_checks_batch.delay(monitor_ids[i : i + batch_size], token)
+
+
+async def heartbeat(membership: SchedulerMembership, resync_at: float) -> float:
+    """
+    Renew the membership, the leader resyncs the wheel on takeover and
+    once `resync_at` (monotonic) is reached. Returns the next `resync_at`
+    """
+    was_leader = membership.is_leader
+    await membership.heartbeat()
+    if not membership.is_leader:
+        return resync_at
+    if not was_leader or time.monotonic() >= resync_at:
+        await resync_schedule()
+        resync_at = time.monotonic() + get_settings().scheduler_resync_interval_sec
+    return resync_at
+
+
+async def run_scheduler(stop: asyncio.Event, membership: SchedulerMembership) -> None:
+    settings = get_settings()
+    redis_client = get_redis_client()
+    heartbeat_sec = settings.scheduler_lease_sec / 3
+
+    heartbeat_at = 0.0
+    resync_at = 0.0
+
+    while not stop.is_set():
+        try:
+            if time.monotonic() - heartbeat_at >= heartbeat_sec:
+                resync_at = await heartbeat(membership, resync_at)
+                heartbeat_at = time.monotonic()
+
+            due_ids, backlog = await pop_due_monitor_ids(
+                redis_client, membership.slots, settings.scheduler_pop_limit
+            )
+            await dispatch(due_ids)
+            if backlog:
+                # no sleep until it's drained
+                continue
+
+            # sleep until the next run, but wake up for monitors added meanwhile
+            # and for the next heartbeat
+            delay = min(
+                settings.scheduler_max_sleep_sec,
+                max(heartbeat_at + heartbeat_sec - time.monotonic(), 0.0),
+            )
+            next_run_at = await get_next_run_at(redis_client, membership.slots)
+            if next_run_at is not None:
+                delay = min(max(next_run_at - time.time(), 0.0), delay)
+        except Exception as exc:
+            # Redis / db hiccup: keep the slots, try again a bit later
+            logger.error(f"Scheduler iteration failed: {exc}")
+            delay = settings.scheduler_max_sleep_sec
+
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+
+
+async def main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    membership = SchedulerMembership(
+        get_redis_client(), get_settings().scheduler_lease_sec
+    )
+    logger.info("Scheduler %s started", membership.instance_id)
+    try:
+        await run_scheduler(stop, membership)
+    finally:
+        await membership.leave()
+        await get_redis_client().aclose()
+        await async_engine.dispose()
+        logger.info("Scheduler %s stopped", membership.instance_id)
+
+
+if __name__ == "__main__":
+    setup_logging()
+    if get_settings().scheduler_backend != "zset":
+        raise SystemExit("Set SCHEDULER_BACKEND=zset, beat schedules monitors now")
+    asyncio.run(main())
@@ -20,3 +20,23 @@ class CheckResultRead(CheckResultBase):
 
     class ConfigDict:
         from_attributes = True
+
+
+class CheckSeriesPoint(BaseModel):
+    bucket_start: dt.datetime
+    total_checks: int = 0
+    up_checks: int = 0
+    uptime_ratio: float | None = None
+    avg_response_time_ms: float | None = None
+    p95_response_time_ms: float | None = Field(
+        default=None,
+        description="Approximate for buckets answered from rollups",
+    )
+
+
+class CheckSeries(BaseModel):
+    monitor_id: uuid.UUID
+    from_ts: dt.datetime
+    to_ts: dt.datetime
+    bucket_sec: int
+    points: list[CheckSeriesPoint]
@@ -0,0 +1,110 @@
+import logging
+import math
+import uuid
+from collections.abc import Iterable, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.dispatch")
+
+# dispatched / suppressed checks of all schedulers, since Redis was started
+DISPATCH_METRICS_KEY = "metrics:dispatch"
+
+# compare-and-delete: a late worker doesn't release the marks of a newer claim
+_RELEASE_INFLIGHT_LUA = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        released = released + redis.call('DEL', key)
+    end
+end
+return released
+"""
+
+
+def inflight_key(monitor_id: str) -> str:
+    return f"monitor:{monitor_id}:inflight"
+
+
+def new_dispatch_token() -> str:
+    return uuid.uuid4().hex
+
+
+def inflight_ttl_sec(checks: int, concurrency: int, delay_sec: float = 0.0) -> int:
+    """
+    Lifetime of in-flight marks of `checks` run `concurrency` at a time:
+    started after `delay_sec`, every wave of checks takes up to the http timeout
+    """
+    settings = get_settings()
+    waves = math.ceil(checks / max(concurrency, 1))
+    return math.ceil(
+        delay_sec
+        + waves * settings.http_timeout_sec
+        + settings.dispatch_inflight_margin_sec
+    )
+
+
+async def claim_dispatch(
+    redis_client: Redis, monitor_ids: Sequence[str], ttl_sec: int, token: str
+) -> list[str]:
+    """
+    Mark checks of monitors as in flight with `token`, one SET NX per monitor
+    in one round-trip. Returns monitors which had no pending / running check,
+    the rest are counted as suppressed duplicates.
+    The mark expires after `ttl_sec` if the worker dies before release.
+    Without Redis checks are dispatched as before
+    """
+    if not monitor_ids:
+        return []
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for monitor_id in monitor_ids:
+                pipe.set(inflight_key(monitor_id), token, nx=True, ex=ttl_sec)
+            claimed_flags = await pipe.execute()
+
+        claimed = [
+            monitor_id
+            for monitor_id, is_claimed in zip(monitor_ids, claimed_flags)
+            if is_claimed
+        ]
+        suppressed = len(monitor_ids) - len(claimed)
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(DISPATCH_METRICS_KEY, "dispatched", len(claimed))
+            pipe.hincrby(DISPATCH_METRICS_KEY, "suppressed", suppressed)
+            await pipe.execute()
+    except RedisError as exc:
+        logger.warning(f"In-flight checks are not tracked: {exc}")
+        return list(monitor_ids)
+
+    if suppressed:
+        logger.info("Suppressed %s duplicate checks still in flight", suppressed)
+    return claimed
+
+
+async def release_dispatch(
+    redis_client: Redis, monitor_ids: Iterable[str], token: str
+) -> None:
+    """
+    Checks of monitors claimed with `token` are done, they can be dispatched
+    again. Marks of other claims are kept
+    """
+    keys = [inflight_key(monitor_id) for monitor_id in monitor_ids]
+    if not keys:
+        return
+    try:
+        await redis_client.eval(_RELEASE_INFLIGHT_LUA, len(keys), *keys, token)
+    except RedisError as exc:
+        # marks expire on their own
+        logger.warning(f"In-flight checks are not released: {exc}")
+
+
+async def get_dispatch_metrics(redis_client: Redis) -> dict[str, int]:
+    metrics = await redis_client.hgetall(DISPATCH_METRICS_KEY)
+    return {
+        "dispatched": int(metrics.get("dispatched", 0)),
+        "suppressed": int(metrics.get("suppressed", 0)),
+    }
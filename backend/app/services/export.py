@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import CheckResult
+
+EXPORT_COLUMNS = (
+    "id",
+    "monitor_id",
+    "checked_at",
+    "is_up",
+    "status_code",
+    "response_time_ms",
+    "error_message",
+)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+        for row in rows
+    )
+
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+async def stream_check_results_export(
+    session_maker: async_sessionmaker[AsyncSession],
+    monitor_id: uuid.UUID,
+    from_ts: datetime | None,
+    to_ts: datetime | None,
+    export_format: str = "ndjson",
+    chunk_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """
+    Checks of monitor (oldest first) read from a server-side cursor and
+    encoded chunk by chunk: memory doesn't depend on number of rows.
+    Has its own session, which lives as long as the response is streamed
+    """
+    stmt = select(*(getattr(CheckResult, name) for name in EXPORT_COLUMNS)).where(
+        CheckResult.monitor_id == monitor_id
+    )
+    if from_ts is not None:
+        stmt = stmt.where(CheckResult.checked_at >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.where(CheckResult.checked_at <= to_ts)
+    stmt = stmt.order_by(CheckResult.checked_at.asc(), CheckResult.id.asc())
+
+    if export_format == "csv":
+        encode = _csv_chunk
+        # header goes out right away, before the first page is read
+        yield _csv_chunk([EXPORT_COLUMNS]).encode()
+    else:
+        encode = _ndjson_chunk
+
+    async with session_maker() as db:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield encode(rows).encode()
@@ -1,38 +1,63 @@
+import asyncio
 import logging
 import time
+from datetime import datetime, timezone
+from typing import Sequence
+from urllib.parse import urlsplit
 
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.redis_client import get_redis_client
-from app.crud.check_result import create_check_result
+from app.core.config import get_settings
+from app.core.http_client import get_http_client
 from app.models.monitor import Monitor as MonitorModel
+from app.services.result_writer import (
+    CheckResultWriter,
+    PendingCheckResult,
+    persist_check_results,
+)
 
 logger = logging.getLogger("app.monitoring")
 
 
-async def perform_http_check(target_url: str, timeout: float = 10.0) -> dict:
-    start = time.monotonic()
+async def perform_http_check(target_url: str, timeout: float | None = None) -> dict:
+    timeout = get_settings().http_timeout_sec if timeout is None else timeout
     status_code = None
     error_message = None
     is_up = False
-    response_time_ms = None
+
+    # time spent on DNS / TCP / TLS is excluded from response time:
+    # pooled connections skip it, so numbers stay comparable
+    setup_sec = 0.0
+    setup_started: dict[str, float] = {}
+
+    async def trace(event_name: str, info: dict) -> None:
+        nonlocal setup_sec
+        if not event_name.startswith("connection."):
+            return
+        step, _, phase = event_name.rpartition(".")
+        if phase == "started":
+            setup_started[step] = time.monotonic()
+        elif step in setup_started:
+            setup_sec += time.monotonic() - setup_started.pop(step)
+
+    client = get_http_client()
+    start = time.monotonic()
 
     try:
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-            response = await client.get(target_url)
+        response = await client.get(
+            target_url, timeout=timeout, extensions={"trace": trace}
+        )
 
-        elapsed_ms = int((time.monotonic() - start) * 1000.0)
-        response_time_ms = elapsed_ms
         status_code = response.status_code
         is_up = 200 <= response.status_code < 400
 
     except httpx.RequestError as exc:
-        elapsed_ms = int((time.monotonic() - start) * 1000.0)
-        response_time_ms = elapsed_ms
         error_message = str(exc)
         is_up = False
 
+    response_time_ms = int((time.monotonic() - start - setup_sec) * 1000.0)
+
     if error_message:
         logger.warning(
             "Monitor check failed: url=%s error=%s response_time_ms=%s",
@@ -56,23 +81,81 @@ async def perform_http_check(target_url: str, timeout: float = 10.0) -> dict:
     }
 
 
-async def check_monitor_once(db: AsyncSession, monitor: MonitorModel):
-    result_data = await perform_http_check(monitor.target_url)
-
-    result = await create_check_result(
-        db=db,
+def pending_result(
+    monitor: MonitorModel, result_data: dict, checked_at: datetime
+) -> PendingCheckResult:
+    return PendingCheckResult(
         monitor_id=monitor.id,
+        checked_at=checked_at,
         is_up=result_data["is_up"],
         status_code=result_data["status_code"],
         response_time_ms=result_data["response_time_ms"],
         error_message=result_data["error_message"],
     )
 
-    redis_client = get_redis_client()
-    cache_key = f"monitor:{monitor.id}:stats:last_24h"
-    try:
-        await redis_client.delete(cache_key)
-    except Exception as exc:
-        logger.warning(f"Failed to invalidate stats cache: {exc}")
 
+async def check_monitor_once(db: AsyncSession, monitor: MonitorModel):
+    result_data = await perform_http_check(monitor.target_url)
+    checked_at = datetime.now(timezone.utc)
+
+    (result,) = await persist_check_results(
+        db, [pending_result(monitor, result_data, checked_at)]
+    )
     return result
+
+
+class ProbePool:
+    """
+    Limits shared by probes on the running event loop: at most `concurrency`
+    checks in flight, `per_host_concurrency` per target host.
+    Semaphores of hosts without probes are dropped, so a long-lived pool
+    doesn't grow with every host ever checked
+    """
+
+    def __init__(self, concurrency: int, per_host_concurrency: int):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._per_host_concurrency = per_host_concurrency
+        # host -> (semaphore, probes holding / waiting for it)
+        self._hosts: dict[str, tuple[asyncio.Semaphore, int]] = {}
+
+    async def probe(self, monitor: MonitorModel, writer: CheckResultWriter) -> None:
+        """Check the monitor, result goes to `writer` as soon as it's ready"""
+        host = urlsplit(monitor.target_url).hostname or ""
+        host_semaphore, users = self._hosts.get(
+            host, (asyncio.Semaphore(self._per_host_concurrency), 0)
+        )
+        self._hosts[host] = (host_semaphore, users + 1)
+        try:
+            async with host_semaphore, self._semaphore:
+                result_data = await perform_http_check(monitor.target_url)
+        finally:
+            host_semaphore, users = self._hosts[host]
+            if users == 1:
+                del self._hosts[host]
+            else:
+                self._hosts[host] = (host_semaphore, users - 1)
+        checked_at = datetime.now(timezone.utc)
+
+        await writer.add(pending_result(monitor, result_data, checked_at))
+
+
+async def probe_monitors(
+    monitors: Sequence[MonitorModel],
+    writer: CheckResultWriter,
+    concurrency: int,
+    per_host_concurrency: int,
+) -> None:
+    """
+    Run http checks of monitors concurrently on the running event loop,
+    results go to `writer` as soon as they are ready.
+    At most `concurrency` checks in flight, `per_host_concurrency` per target host
+    """
+    pool = ProbePool(concurrency, per_host_concurrency)
+    # one failed probe doesn't cancel the rest, all of them are done on return
+    results = await asyncio.gather(
+        *(pool.probe(monitor, writer) for monitor in monitors),
+        return_exceptions=True,
+    )
+    for monitor, result in zip(monitors, results):
+        if isinstance(result, Exception):
+            logger.error(f"Check of monitor {monitor.id} failed: {result}")
@@ -0,0 +1,126 @@
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+
+logger = logging.getLogger("app.partitions")
+
+PARENT_TABLE = "check_results"
+
+_BOUNDS_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_start(ts: datetime, interval: str) -> datetime:
+    """Start of the day / week (monday) partition `ts` falls into, UTC"""
+    start = ts.astimezone(timezone.utc).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    if interval == "week":
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def partition_step(interval: str) -> timedelta:
+    return timedelta(weeks=1) if interval == "week" else timedelta(days=1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+async def ensure_check_result_partitions(
+    db: AsyncSession, now: datetime | None = None
+) -> list[str]:
+    """
+    Create partitions from the current one up to `check_results_partitions_ahead`
+    intervals ahead. Returns names of partitions which didn't exist
+    """
+    settings = get_settings()
+    interval = settings.check_results_partition_interval
+    step = partition_step(interval)
+
+    now = now or datetime.now(timezone.utc)
+    start = partition_start(now, interval)
+
+    # bounds of existing partitions, they may have other interval
+    existing = [bounds for bounds in (await _get_partitions(db)).values() if bounds]
+    created = []
+
+    for _ in range(settings.check_results_partitions_ahead + 1):
+        end = start + step
+        if not any(lower < end and start < upper for lower, upper in existing):
+            name = partition_name(start)
+            await db.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} "
+                    f"PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') "
+                    f"TO ('{end.isoformat()}')"
+                )
+            )
+            created.append(name)
+        start = end
+
+    await db.commit()
+
+    if created:
+        logger.info("Created check_results partitions: %s", ", ".join(created))
+    return created
+
+
+async def drop_expired_check_result_partitions(
+    db: AsyncSession, now: datetime | None = None
+) -> list[str]:
+    """
+    Retention: drop whole partitions older than `check_results_retention_days`
+    instead of DELETE. Returns names of dropped partitions
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+    threshold = now - timedelta(days=settings.check_results_retention_days)
+
+    dropped = []
+    for name, bounds in (await _get_partitions(db)).items():
+        if bounds is not None and bounds[1] <= threshold:
+            await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    await db.commit()
+
+    if dropped:
+        logger.info("Dropped check_results partitions: %s", ", ".join(dropped))
+    return dropped
+
+
+async def _get_partitions(
+    db: AsyncSession,
+) -> dict[str, tuple[datetime, datetime] | None]:
+    """Partitions of check_results with their bounds (None for default)"""
+    rows = await db.execute(
+        text(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:parent AS regclass)
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+
+    partitions = {}
+    for name, bound in rows:
+        match = _BOUNDS_RE.search(bound or "")
+        partitions[name] = (
+            (
+                datetime.fromisoformat(match.group(1)),
+                datetime.fromisoformat(match.group(2)),
+            )
+            if match
+            else None
+        )
+    return partitions
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.redis_client import get_redis_client
+from app.crud.check_result import create_check_results
+from app.crud.monitor import advance_monitors_schedule
+from app.models.check_result import CheckResult as CheckResultModel
+from app.services.rollups import upsert_rollups
+from app.services.stats import current_xact_id, record_checks_in_stats_cache
+
+logger = logging.getLogger("app.result_writer")
+
+# SQLSTATE classes worth a retry: connection exception, insufficient resources,
+# operator intervention, transaction rollback (serialization failure, deadlock)
+_TRANSIENT_SQLSTATE_CLASSES = ("08", "53", "57", "40")
+
+
+def is_transient_db_error(exc: Exception) -> bool:
+    """Errors of the connection / transaction, not of the rows written"""
+    if isinstance(exc, (OSError, asyncio.TimeoutError)):
+        return True
+    if not isinstance(exc, DBAPIError):
+        return False
+    if exc.connection_invalidated:
+        return True
+    sqlstate = getattr(exc.orig, "sqlstate", None) or ""
+    return sqlstate[:2] in _TRANSIENT_SQLSTATE_CLASSES
+
+
+@dataclass
+class PendingCheckResult:
+    monitor_id: uuid.UUID
+    checked_at: datetime
+    is_up: bool
+    status_code: int | None
+    response_time_ms: int | None
+    error_message: str | None
+
+
+async def persist_check_results(
+    db: AsyncSession,
+    pending: Sequence[PendingCheckResult],
+) -> Sequence[CheckResultModel]:
+    """
+    Write results, rollups and advance monitors schedule in one transaction,
+    then add them to stats cache of touched monitors in one round-trip
+    """
+    if not pending:
+        return []
+
+    last_checked_at: dict[uuid.UUID, datetime] = {}
+    for item in pending:
+        current = last_checked_at.get(item.monitor_id)
+        if current is None or item.checked_at > current:
+            last_checked_at[item.monitor_id] = item.checked_at
+
+    # committed together with the results below
+    await advance_monitors_schedule(db, last_checked_at)
+    await upsert_rollups(db, pending)
+    xact_id = await current_xact_id(db)
+    results = await create_check_results(db, [asdict(item) for item in pending])
+
+    try:
+        await record_checks_in_stats_cache(get_redis_client(), pending, xact_id)
+    except Exception as exc:
+        logger.warning(f"Failed to update stats cache: {exc}")
+
+    return results
+
+
+class CheckResultWriter:
+    """
+    Buffer for results of concurrent probes.
+    Flushed with one multi-row insert when `max_batch` results are gathered,
+    every `flush_interval_sec` once started and on close.
+    A batch failed by connection / transaction errors is kept for at most
+    `max_retries` more flushes; any other error is narrowed down by bisecting
+    the batch and only the rows failing on their own are dropped.
+    `on_flushed` is awaited with every written batch, `on_dropped` with
+    results given up on
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        max_batch: int = 500,
+        flush_interval_sec: float = 1.0,
+        max_buffer: int = 50_000,
+        max_retries: int = 5,
+        on_flushed: (
+            Callable[[Sequence[PendingCheckResult]], Awaitable[None]] | None
+        ) = None,
+        on_dropped: (
+            Callable[[Sequence[PendingCheckResult]], Awaitable[None]] | None
+        ) = None,
+    ):
+        self._session_maker = session_maker
+        self._on_flushed = on_flushed
+        self._on_dropped = on_dropped
+        self._max_batch = max_batch
+        self._max_buffer = max_buffer
+        self._max_retries = max_retries
+        self._retries = 0
+        self._flush_interval_sec = flush_interval_sec
+        self._buffer: list[PendingCheckResult] = []
+        self._flush_lock = asyncio.Lock()
+        self._flusher: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, item: PendingCheckResult) -> None:
+        """
+        Buffer the result. A failed flush doesn't fail the caller:
+        the result stays buffered for the next one
+        """
+        self._buffer.append(item)
+        if len(self._buffer) >= self._max_batch:
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.error(f"Failed to flush check results: {exc}")
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+
+            batch, self._buffer = self._buffer, []
+            written, unwritten, dropped, error = await self._write(batch)
+            if unwritten:
+                dropped += self._requeue(unwritten)
+            else:
+                self._retries = 0
+
+            logger.debug("Flushed %s check results", len(written))
+
+        if written and self._on_flushed is not None:
+            await self._on_flushed(written)
+        if dropped and self._on_dropped is not None:
+            await self._on_dropped(dropped)
+        if error is not None:
+            raise error
+
+    async def _write(self, batch: list[PendingCheckResult]) -> tuple[
+        list[PendingCheckResult],
+        list[PendingCheckResult],
+        list[PendingCheckResult],
+        Exception | None,
+    ]:
+        """
+        Returns written results, results to retry, dropped results and
+        the error which stopped writing them
+        """
+        try:
+            async with self._session_maker() as db:
+                await persist_check_results(db, batch)
+            return batch, [], [], None
+        except Exception as exc:
+            if is_transient_db_error(exc):
+                return [], batch, [], exc
+            if len(batch) == 1:
+                logger.error(
+                    f"Dropped check result of monitor {batch[0].monitor_id}: {exc}"
+                )
+                return [], [], batch, None
+
+        middle = len(batch) // 2
+        written, unwritten, dropped, error = await self._write(batch[:middle])
+        if error is not None:
+            return written, unwritten + batch[middle:], dropped, error
+        written_rest, unwritten, dropped_rest, error = await self._write(batch[middle:])
+        return written + written_rest, unwritten, dropped + dropped_rest, error
+
+    def _requeue(self, batch: list[PendingCheckResult]) -> list[PendingCheckResult]:
+        """Keep results for the next attempts, but not forever. Returns dropped"""
+        self._retries += 1
+        if self._retries > self._max_retries:
+            self._retries = 0
+            logger.error(
+                f"Dropped {len(batch)} check results unsaved "
+                f"after {self._max_retries} retries"
+            )
+            return batch
+
+        self._buffer[:0] = batch
+        overflow = len(self._buffer) - self._max_buffer
+        if overflow <= 0:
+            return []
+        dropped = self._buffer[:overflow]
+        del self._buffer[:overflow]
+        logger.error(f"Dropped {overflow} unsaved check results")
+        return dropped
+
+    def start(self) -> None:
+        """Start periodic flush on running event loop"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Stop periodic flush and write everything left in the buffer"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_sec)
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.error(f"Failed to flush check results: {exc}")
+
+    async def __aenter__(self) -> "CheckResultWriter":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
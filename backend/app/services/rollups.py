@@ -0,0 +1,374 @@
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Mapping, Sequence
+
+from sqlalchemy import and_, delete, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import CheckResult, CheckResultRollup
+
+if TYPE_CHECKING:
+    from app.services.result_writer import PendingCheckResult
+
+# coarsest first: stats take whole days, then hours, then minutes
+GRANULARITIES_SEC = (24 * 60 * 60, 60 * 60, 60)
+
+# upper bounds of latency histogram buckets, last bucket is for anything slower
+LATENCY_BUCKETS_MS = (
+    10, 20, 30, 50, 75, 100, 150, 200, 300, 500,
+    750, 1000, 1500, 2000, 3000, 5000, 7500, 10000,
+)  # fmt: skip
+
+
+@dataclass
+class StatsAggregate:
+    total_checks: int = 0
+    up_checks: int = 0
+    response_time_sum: int = 0
+    response_time_count: int = 0
+    response_time_min: int | None = None
+    response_time_max: int | None = None
+
+    def __add__(self, other: "StatsAggregate") -> "StatsAggregate":
+        return StatsAggregate(
+            total_checks=self.total_checks + other.total_checks,
+            up_checks=self.up_checks + other.up_checks,
+            response_time_sum=self.response_time_sum + other.response_time_sum,
+            response_time_count=self.response_time_count + other.response_time_count,
+            response_time_min=_none_safe(
+                min, self.response_time_min, other.response_time_min
+            ),
+            response_time_max=_none_safe(
+                max, self.response_time_max, other.response_time_max
+            ),
+        )
+
+    @property
+    def avg_response_time_ms(self) -> float | None:
+        if not self.response_time_count:
+            return None
+        return self.response_time_sum / self.response_time_count
+
+
+def _none_safe(fn, a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return fn(a, b)
+
+
+def floor_ts(ts: datetime, bucket_sec: int) -> datetime:
+    epoch = ts.timestamp()
+    return datetime.fromtimestamp(epoch - epoch % bucket_sec, tz=timezone.utc)
+
+
+def ceil_ts(ts: datetime, bucket_sec: int) -> datetime:
+    floored = floor_ts(ts, bucket_sec)
+    return floored if floored == ts else floored + timedelta(seconds=bucket_sec)
+
+
+def latency_bucket(response_time_ms: int) -> int:
+    return bisect_left(LATENCY_BUCKETS_MS, response_time_ms)
+
+
+def percentile_from_histogram(histogram: Sequence[int], q: float) -> float | None:
+    """Upper bound of the histogram bucket holding `q` quantile"""
+    total = sum(histogram)
+    if not total:
+        return None
+
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            break
+    return float(LATENCY_BUCKETS_MS[min(i, len(LATENCY_BUCKETS_MS) - 1)])
+
+
+def plan_range(
+    start: datetime,
+    end: datetime,
+    granularities: Sequence[int] = GRANULARITIES_SEC,
+    retained_from: Mapping[int, datetime] | None = None,
+) -> tuple[list[tuple[int, datetime, datetime]], list[tuple[datetime, datetime]]]:
+    """
+    Split [start, end) into the coarsest whole rollup buckets
+    and raw edges, which are shorter than the finest bucket.
+    Buckets starting before `retained_from` of their granularity are purged,
+    such part of the range goes to finer buckets, and to raw rows in the end
+    """
+    if start >= end:
+        return [], []
+    if not granularities:
+        return [], [(start, end)]
+
+    bucket_sec, finer = granularities[0], granularities[1:]
+    buckets_from = ceil_ts(start, bucket_sec)
+    if retained_from and bucket_sec in retained_from:
+        buckets_from = max(buckets_from, ceil_ts(retained_from[bucket_sec], bucket_sec))
+    buckets_to = floor_ts(end, bucket_sec)
+    if buckets_from >= buckets_to:
+        return plan_range(start, end, finer, retained_from)
+
+    head_rollups, head_raw = plan_range(start, buckets_from, finer, retained_from)
+    tail_rollups, tail_raw = plan_range(buckets_to, end, finer, retained_from)
+    return (
+        head_rollups + [(bucket_sec, buckets_from, buckets_to)] + tail_rollups,
+        head_raw + tail_raw,
+    )
+
+
+def rollup_rows(pending: Sequence["PendingCheckResult"]) -> list[dict]:
+    """Rows to upsert for a batch of results, one per monitor / bucket"""
+    rows: dict[tuple, dict] = {}
+
+    for item in pending:
+        for bucket_sec in GRANULARITIES_SEC:
+            bucket_start = floor_ts(item.checked_at, bucket_sec)
+            row = rows.get((item.monitor_id, bucket_sec, bucket_start))
+            if row is None:
+                row = rows[(item.monitor_id, bucket_sec, bucket_start)] = {
+                    "monitor_id": item.monitor_id,
+                    "bucket_sec": bucket_sec,
+                    "bucket_start": bucket_start,
+                    "total_checks": 0,
+                    "up_checks": 0,
+                    "response_time_sum": 0,
+                    "response_time_count": 0,
+                    "response_time_min": None,
+                    "response_time_max": None,
+                    "latency_histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+
+            row["total_checks"] += 1
+            row["up_checks"] += int(item.is_up)
+
+            rt = item.response_time_ms
+            if rt is not None:
+                row["response_time_sum"] += rt
+                row["response_time_count"] += 1
+                row["response_time_min"] = _none_safe(min, row["response_time_min"], rt)
+                row["response_time_max"] = _none_safe(max, row["response_time_max"], rt)
+                row["latency_histogram"][latency_bucket(rt)] += 1
+
+    # same lock order in concurrent writers
+    return [rows[key] for key in sorted(rows)]
+
+
+async def upsert_rollups(
+    db: AsyncSession, pending: Sequence["PendingCheckResult"]
+) -> None:
+    """
+    Add batch of results to rollups.
+    Doesn't commit: must be a part of the transaction, which writes the results
+    """
+    rows = rollup_rows(pending)
+    if not rows:
+        return
+
+    stmt = insert(CheckResultRollup)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            CheckResultRollup.monitor_id,
+            CheckResultRollup.bucket_sec,
+            CheckResultRollup.bucket_start,
+        ],
+        set_={
+            "total_checks": CheckResultRollup.total_checks + excluded.total_checks,
+            "up_checks": CheckResultRollup.up_checks + excluded.up_checks,
+            "response_time_sum": CheckResultRollup.response_time_sum
+            + excluded.response_time_sum,
+            "response_time_count": CheckResultRollup.response_time_count
+            + excluded.response_time_count,
+            # least / greatest skip NULLs
+            "response_time_min": func.least(
+                CheckResultRollup.response_time_min, excluded.response_time_min
+            ),
+            "response_time_max": func.greatest(
+                CheckResultRollup.response_time_max, excluded.response_time_max
+            ),
+            "latency_histogram": literal_column(
+                "ARRAY(SELECT a + b FROM unnest("
+                "check_result_rollups.latency_histogram, "
+                "excluded.latency_histogram) AS u(a, b))"
+            ),
+        },
+    )
+    await db.execute(stmt, rows)
+
+
+async def aggregate_rollups(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    segments: Sequence[tuple[int, datetime, datetime]],
+) -> StatsAggregate:
+    if not segments:
+        return StatsAggregate()
+
+    row = (
+        await db.execute(
+            select(
+                func.sum(CheckResultRollup.total_checks),
+                func.sum(CheckResultRollup.up_checks),
+                func.sum(CheckResultRollup.response_time_sum),
+                func.sum(CheckResultRollup.response_time_count),
+                func.min(CheckResultRollup.response_time_min),
+                func.max(CheckResultRollup.response_time_max),
+            ).where(
+                CheckResultRollup.monitor_id == monitor_id,
+                or_(
+                    *(
+                        and_(
+                            CheckResultRollup.bucket_sec == bucket_sec,
+                            CheckResultRollup.bucket_start >= start,
+                            CheckResultRollup.bucket_start < end,
+                        )
+                        for bucket_sec, start, end in segments
+                    )
+                ),
+            )
+        )
+    ).one()
+    return _aggregate_from_row(row)
+
+
+async def aggregate_raw_checks(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    segments: Sequence[tuple[datetime, datetime]],
+    to_ts: datetime | None = None,
+) -> StatsAggregate:
+    """
+    Aggregate raw checks in [start, end) segments,
+    a segment ending at `to_ts` includes it
+    """
+    if not segments:
+        return StatsAggregate()
+
+    row = (
+        await db.execute(
+            select(
+                func.count(),
+                func.count().filter(CheckResult.is_up.is_(True)),
+                func.sum(CheckResult.response_time_ms),
+                func.count(CheckResult.response_time_ms),
+                func.min(CheckResult.response_time_ms),
+                func.max(CheckResult.response_time_ms),
+            ).where(
+                CheckResult.monitor_id == monitor_id,
+                raw_segments_filter(segments, to_ts),
+            )
+        )
+    ).one()
+    return _aggregate_from_row(row)
+
+
+def raw_segments_filter(
+    segments: Sequence[tuple[datetime, datetime]], to_ts: datetime | None = None
+):
+    """
+    checked_at in any of [start, end) segments,
+    a segment ending at `to_ts` includes it
+    """
+    return or_(
+        *(
+            and_(
+                CheckResult.checked_at >= start,
+                (
+                    CheckResult.checked_at <= end
+                    if end == to_ts
+                    else CheckResult.checked_at < end
+                ),
+            )
+            for start, end in segments
+        )
+    )
+
+
+async def aggregate_checks(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    from_ts: datetime,
+    to_ts: datetime,
+    now: datetime | None = None,
+) -> StatsAggregate:
+    """
+    Aggregate checks in [from_ts, to_ts] from the coarsest retained rollups
+    covering it. Edges shorter than a minute, edges of purged minute / hour
+    buckets and the live window (late writes) come from raw rows
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+
+    rollup_until = min(to_ts, now - timedelta(seconds=settings.rollup_live_window_sec))
+    rollup_segments, raw_segments = plan_range(
+        from_ts,
+        rollup_until,
+        retained_from={
+            bucket_sec: now - timedelta(days=days)
+            for bucket_sec, days in rollup_retention_days().items()
+        },
+    )
+    raw_segments.append((max(from_ts, rollup_until), to_ts))
+
+    return await aggregate_rollups(db, monitor_id, rollup_segments) + (
+        await aggregate_raw_checks(db, monitor_id, _merge(raw_segments), to_ts)
+    )
+
+
+def rollup_retention_days() -> dict[int, int]:
+    """Retention of minute / hour buckets, day buckets are kept forever"""
+    settings = get_settings()
+    return {
+        60: settings.rollup_minute_retention_days,
+        60 * 60: settings.rollup_hour_retention_days,
+    }
+
+
+async def purge_expired_rollups(db: AsyncSession, now: datetime | None = None) -> int:
+    """Drop minute / hour buckets past their retention, day buckets are kept"""
+    now = now or datetime.now(timezone.utc)
+
+    deleted = 0
+    for bucket_sec, days in rollup_retention_days().items():
+        result = await db.execute(
+            delete(CheckResultRollup).where(
+                CheckResultRollup.bucket_sec == bucket_sec,
+                CheckResultRollup.bucket_start < now - timedelta(days=days),
+            )
+        )
+        deleted += result.rowcount
+
+    await db.commit()
+    return deleted
+
+
+def _merge(
+    segments: list[tuple[datetime, datetime]],
+) -> list[tuple[datetime, datetime]]:
+    merged: list[tuple[datetime, datetime]] = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _aggregate_from_row(row) -> StatsAggregate:
+    total, up, rt_sum, rt_count, rt_min, rt_max = row
+    return StatsAggregate(
+        total_checks=int(total or 0),
+        up_checks=int(up or 0),
+        response_time_sum=int(rt_sum or 0),
+        response_time_count=int(rt_count or 0),
+        response_time_min=rt_min,
+        response_time_max=rt_max,
+    )
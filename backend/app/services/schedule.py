@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import time
+import uuid
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Protocol
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.redis_client import get_redis_client
+from app.models import Monitor as MonitorModel
+
+logger = logging.getLogger("app.schedule")
+
+# Timing wheel of the `zset` scheduler backend:
+#   monitors:schedule:<slot> - sorted set of monitor ids by next run (epoch seconds)
+#   SCHEDULE_INTERVALS_KEY   - hash of monitor id -> check_interval_sec
+# A monitor always lives in the same one of SCHEDULE_SLOTS slots, slots are
+# shared out between scheduler instances. Postgres stays the source of truth,
+# all keys are rebuilt from it
+SCHEDULE_SLOTS = 64
+SCHEDULE_INTERVALS_KEY = "monitors:schedule:intervals"
+
+_SYNC_BATCH_SIZE = 1000
+
+# Pop due monitors and put them back at their next run in one step,
+# so two schedulers never dispatch the same run. The next run keeps the phase
+# of the monitor: runs missed while the scheduler was down are skipped
+_POP_DUE_LUA = """
+local now = tonumber(ARGV[1])
+local due = redis.call(
+    'ZRANGEBYSCORE', KEYS[1], '-inf', now, 'WITHSCORES', 'LIMIT', 0, ARGV[2]
+)
+local popped = {}
+for i = 1, #due, 2 do
+    local member = due[i]
+    local run_at = tonumber(due[i + 1])
+    local interval = tonumber(redis.call('HGET', KEYS[2], member))
+    if interval and interval > 0 then
+        local missed = math.floor((now - run_at) / interval)
+        local next_run = run_at + interval * (missed + 1)
+        redis.call('ZADD', KEYS[1], next_run, member)
+        table.insert(popped, member)
+    else
+        redis.call('ZREM', KEYS[1], member)
+    end
+end
+return popped
+"""
+
+
+def schedule_key(slot: int) -> str:
+    return f"monitors:schedule:{slot}"
+
+
+def monitor_slot(monitor_id: uuid.UUID | str) -> int:
+    if isinstance(monitor_id, str):
+        monitor_id = uuid.UUID(monitor_id)
+    digest = hashlib.sha256(monitor_id.bytes).digest()
+    # other bytes than the phase offset, slot and phase are independent
+    return int.from_bytes(digest[8:16], "big") % SCHEDULE_SLOTS
+
+
+class ScheduledMonitor(Protocol):
+    id: uuid.UUID
+    is_active: bool
+    check_interval_sec: int
+    next_check_at: datetime
+
+
+def _zset_enabled() -> bool:
+    return get_settings().scheduler_backend == "zset"
+
+
+async def _apply_schedule(
+    redis_client: Redis, monitors: Iterable[ScheduledMonitor], nx: bool = False
+) -> None:
+    """Active monitors are put to the wheel at their next run, the rest removed"""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for monitor in monitors:
+            member = str(monitor.id)
+            if monitor.is_active:
+                pipe.hset(SCHEDULE_INTERVALS_KEY, member, monitor.check_interval_sec)
+                pipe.zadd(
+                    schedule_key(monitor_slot(monitor.id)),
+                    {member: monitor.next_check_at.timestamp()},
+                    nx=nx,
+                )
+            else:
+                pipe.zrem(schedule_key(monitor_slot(monitor.id)), member)
+                pipe.hdel(SCHEDULE_INTERVALS_KEY, member)
+        await pipe.execute()
+
+
+async def schedule_monitors(monitors: Iterable[ScheduledMonitor]) -> None:
+    """
+    Keep the wheel in sync after monitors were created / edited / switched.
+    Failures are only logged: the scheduler resyncs from db periodically
+    """
+    if not _zset_enabled():
+        return
+    try:
+        await _apply_schedule(get_redis_client(), monitors)
+    except RedisError as exc:
+        logger.warning(f"Schedule of monitors is not synced: {exc}")
+
+
+async def sync_monitors_schedule(db: AsyncSession, *criteria) -> None:
+    """Same as `schedule_monitors` for monitors matching `criteria`"""
+    if not _zset_enabled():
+        return
+    monitors = (
+        await db.execute(
+            select(
+                MonitorModel.id,
+                MonitorModel.is_active,
+                MonitorModel.check_interval_sec,
+                MonitorModel.next_check_at,
+            ).where(*criteria)
+        )
+    ).all()
+    await schedule_monitors(monitors)
+
+
+async def rebuild_schedule(db: AsyncSession, redis_client: Redis) -> int:
+    """
+    Put every active monitor to the wheel and drop the rest, one pass over db.
+    Monitors already in the wheel keep their next run. Only monitors which
+    were in the wheel before the pass can be dropped: those added by the api
+    meanwhile aren't seen by it
+    """
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for slot in range(SCHEDULE_SLOTS):
+            pipe.zrange(schedule_key(slot), 0, -1)
+        scheduled_before = await pipe.execute()
+
+    active: set[str] = set()
+    result = await db.stream(
+        select(
+            MonitorModel.id,
+            MonitorModel.is_active,
+            MonitorModel.check_interval_sec,
+            MonitorModel.next_check_at,
+        )
+        .where(MonitorModel.is_active)
+        .execution_options(yield_per=_SYNC_BATCH_SIZE)
+    )
+    async for partition in result.partitions():
+        await _apply_schedule(redis_client, partition, nx=True)
+        active.update(str(monitor.id) for monitor in partition)
+
+    for slot, scheduled in enumerate(scheduled_before):
+        stale = [member for member in scheduled if member not in active]
+        for i in range(0, len(stale), _SYNC_BATCH_SIZE):
+            chunk = stale[i : i + _SYNC_BATCH_SIZE]
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zrem(schedule_key(slot), *chunk)
+                pipe.hdel(SCHEDULE_INTERVALS_KEY, *chunk)
+                await pipe.execute()
+
+    return len(active)
+
+
+def plan_dispatch(
+    due_runs: Sequence[tuple[uuid.UUID, datetime]],
+    now: datetime,
+    batch_size: int,
+) -> list[tuple[float, list[str]]]:
+    """
+    (countdown, monitor ids) batches for runs found due by a poll at `now`.
+    The poll looks one beat ahead: every run starts at its due time, runs
+    already late start right away. A batch holds runs due in the same second,
+    at most `batch_size` of them
+    """
+    batches: list[tuple[float, list[str]]] = []
+    batch_second = None
+    for monitor_id, due_at in due_runs:
+        countdown = max((due_at - now).total_seconds(), 0.0)
+        if int(countdown) != batch_second or len(batches[-1][1]) >= batch_size:
+            batch_second = int(countdown)
+            batches.append((countdown, []))
+        batches[-1][1].append(str(monitor_id))
+    return batches
+
+
+async def pop_due_monitor_ids(
+    redis_client: Redis,
+    slots: Iterable[int],
+    limit: int,
+    now: float | None = None,
+) -> tuple[list[str], bool]:
+    """
+    Ids of monitors of `slots` due at `now`, already moved to their next run.
+    At most `limit` per slot, one round-trip.
+    The flag is set if any slot hit the limit: more may be due there
+    """
+    now = time.time() if now is None else now
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for slot in slots:
+            pipe.eval(
+                _POP_DUE_LUA, 2, schedule_key(slot), SCHEDULE_INTERVALS_KEY, now, limit
+            )
+        popped = await pipe.execute()
+    due_ids = [monitor_id for slot_popped in popped for monitor_id in slot_popped]
+    return due_ids, any(len(slot_popped) >= limit for slot_popped in popped)
+
+
+async def get_next_run_at(redis_client: Redis, slots: Iterable[int]) -> float | None:
+    """Epoch seconds of the earliest run of `slots`"""
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for slot in slots:
+            pipe.zrange(schedule_key(slot), 0, 0, withscores=True)
+        heads = await pipe.execute()
+    return min((head[0][1] for head in heads if head), default=None)
@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import os
+import socket
+import time
+import uuid
+
+from redis.asyncio import Redis
+
+from app.services.schedule import SCHEDULE_SLOTS
+
+logger = logging.getLogger("app.scheduler_membership")
+
+# Scheduler instances sharing the wheel:
+#   MEMBERS_KEY - sorted set of instance ids by lease expiry (epoch seconds)
+#   LEADER_KEY  - id of the instance which resyncs the wheel from db, with a lease
+MEMBERS_KEY = "scheduler:members"
+LEADER_KEY = "scheduler:leader"
+
+# take the lease if it's free, prolong it if it's ours
+_ACQUIRE_LEASE_LUA = """
+local holder = redis.call('GET', KEYS[1])
+if holder == false then
+    redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+if holder == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_LEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def owned_slots(instance_id: str, members: list[str]) -> list[int]:
+    """
+    Slots of the instance by rendezvous hashing: every slot goes to the member
+    with the highest hash of (member, slot), so a joining / leaving member
+    moves only its own share of slots
+    """
+
+    def weight(member: str, slot: int) -> bytes:
+        return hashlib.sha256(f"{member}:{slot}".encode()).digest()
+
+    return [
+        slot
+        for slot in range(SCHEDULE_SLOTS)
+        if max(members, key=lambda member: weight(member, slot)) == instance_id
+    ]
+
+
+class SchedulerMembership:
+    """
+    Membership of one scheduler instance: a heartbeat keeps the instance
+    in MEMBERS_KEY, members whose lease expired are dropped and their slots
+    are taken over by the rest on their next heartbeat.
+    A failed heartbeat keeps slots and leadership until the lease of the last
+    successful one expires, then they are given up: others own them by now
+    """
+
+    def __init__(self, redis_client: Redis, lease_sec: float):
+        self.redis_client = redis_client
+        self.lease_sec = lease_sec
+        self.instance_id = (
+            f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.members: list[str] = []
+        self.slots: list[int] = []
+        self.is_leader = False
+        # monotonic time the lease of the last successful heartbeat ends
+        self.lease_expires_at = 0.0
+
+    async def heartbeat(self) -> bool:
+        """Renew leases, returns True if slots of the instance changed"""
+        started = time.monotonic()
+        now = time.time()
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(MEMBERS_KEY, {self.instance_id: now + self.lease_sec})
+                pipe.zremrangebyscore(MEMBERS_KEY, "-inf", now)
+                pipe.zrange(MEMBERS_KEY, 0, -1)
+                pipe.eval(
+                    _ACQUIRE_LEASE_LUA,
+                    1,
+                    LEADER_KEY,
+                    self.instance_id,
+                    int(self.lease_sec * 1000),
+                )
+                _, _, members, is_leader = await pipe.execute()
+        except Exception:
+            if (self.slots or self.is_leader) and (
+                time.monotonic() >= self.lease_expires_at
+            ):
+                logger.warning(
+                    "Lease of instance %s expired, its slots are given up",
+                    self.instance_id,
+                )
+                self.slots, self.is_leader = [], False
+            raise
+        self.lease_expires_at = started + self.lease_sec
+
+        if bool(is_leader) != self.is_leader:
+            logger.info(
+                "Instance %s %s leader",
+                self.instance_id,
+                "became" if is_leader else "is no longer",
+            )
+        self.is_leader = bool(is_leader)
+
+        slots = owned_slots(self.instance_id, sorted(members))
+        changed = slots != self.slots
+        if changed:
+            logger.info(
+                "Rebalanced: %s members, instance %s owns %s of %s slots",
+                len(members),
+                self.instance_id,
+                len(slots),
+                SCHEDULE_SLOTS,
+            )
+        self.members, self.slots = sorted(members), slots
+        return changed
+
+    async def leave(self) -> None:
+        """Hand slots and leadership over right away instead of on lease expiry"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.zrem(MEMBERS_KEY, self.instance_id)
+            pipe.eval(_RELEASE_LEASE_LUA, 1, LEADER_KEY, self.instance_id)
+            await pipe.execute()
+        self.slots, self.is_leader = [], False
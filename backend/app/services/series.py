@@ -0,0 +1,249 @@
+import math
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models import CheckResult, CheckResultRollup
+from app.schemas.check_result import CheckSeries, CheckSeriesPoint
+from app.services.rollups import (
+    GRANULARITIES_SEC,
+    LATENCY_BUCKETS_MS,
+    StatsAggregate,
+    ceil_ts,
+    floor_ts,
+    latency_bucket,
+    percentile_from_histogram,
+    raw_segments_filter,
+    rollup_retention_days,
+)
+
+# bucket sizes a series is snapped to, longer ranges use whole days
+SERIES_STEPS_SEC = (60, 5 * 60, 15 * 60, 60 * 60, 6 * 60 * 60, 24 * 60 * 60)
+
+# buckets are aligned the same way as rollups
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def pick_bucket_sec(
+    from_ts: datetime,
+    to_ts: datetime,
+    max_points: int | None = None,
+    resolution_sec: int | None = None,
+) -> int:
+    """
+    Bucket size giving at most `max_points` points (capped by settings).
+    Explicit resolution is used as is unless it gives more points
+    """
+    settings = get_settings()
+    max_points = min(
+        max_points or settings.series_max_points, settings.series_max_points
+    )
+
+    range_sec = max((to_ts - from_ts).total_seconds(), 1.0)
+    min_bucket_sec = math.ceil(range_sec / max_points)
+
+    if resolution_sec is not None and resolution_sec >= min_bucket_sec:
+        return resolution_sec
+
+    for step in SERIES_STEPS_SEC:
+        if step >= min_bucket_sec:
+            return step
+    day = SERIES_STEPS_SEC[-1]
+    return math.ceil(min_bucket_sec / day) * day
+
+
+@dataclass
+class _SeriesBucket:
+    aggregate: StatsAggregate = field(default_factory=StatsAggregate)
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    )
+
+    def add_check(self, is_up: bool, response_time_ms: int | None) -> None:
+        self.aggregate += StatsAggregate(
+            total_checks=1,
+            up_checks=int(is_up),
+            response_time_sum=response_time_ms or 0,
+            response_time_count=int(response_time_ms is not None),
+            response_time_min=response_time_ms,
+            response_time_max=response_time_ms,
+        )
+        if response_time_ms is not None:
+            self.histogram[latency_bucket(response_time_ms)] += 1
+
+    def add_rollup(self, rollup: CheckResultRollup) -> None:
+        self.aggregate += StatsAggregate(
+            total_checks=rollup.total_checks,
+            up_checks=rollup.up_checks,
+            response_time_sum=rollup.response_time_sum,
+            response_time_count=rollup.response_time_count,
+            response_time_min=rollup.response_time_min,
+            response_time_max=rollup.response_time_max,
+        )
+        for i, count in enumerate(rollup.latency_histogram):
+            self.histogram[i] += count
+
+    def to_point(self, bucket_start: datetime) -> CheckSeriesPoint:
+        total = self.aggregate.total_checks
+        return CheckSeriesPoint(
+            bucket_start=bucket_start,
+            total_checks=total,
+            up_checks=self.aggregate.up_checks,
+            uptime_ratio=self.aggregate.up_checks / total if total else None,
+            avg_response_time_ms=self.aggregate.avg_response_time_ms,
+            p95_response_time_ms=percentile_from_histogram(self.histogram, 0.95),
+        )
+
+
+async def _raw_series(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    from_ts: datetime,
+    to_ts: datetime,
+    bucket_sec: int,
+) -> list[CheckSeriesPoint]:
+    """Series over raw rows, bucketed with date_bin on db side, exact p95"""
+    bucket_start = func.date_bin(
+        timedelta(seconds=bucket_sec), CheckResult.checked_at, _EPOCH
+    ).label("bucket_start")
+
+    rows = await db.execute(
+        select(
+            bucket_start,
+            func.count(),
+            func.count().filter(CheckResult.is_up.is_(True)),
+            func.avg(CheckResult.response_time_ms),
+            func.percentile_cont(0.95).within_group(CheckResult.response_time_ms),
+        )
+        .where(
+            CheckResult.monitor_id == monitor_id,
+            CheckResult.checked_at >= from_ts,
+            CheckResult.checked_at <= to_ts,
+        )
+        # by output column: the expression has its own bind params
+        .group_by(literal_column("bucket_start"))
+        .order_by(literal_column("bucket_start"))
+    )
+
+    return [
+        CheckSeriesPoint(
+            bucket_start=start,
+            total_checks=total,
+            up_checks=up,
+            uptime_ratio=up / total if total else None,
+            avg_response_time_ms=float(avg) if avg is not None else None,
+            p95_response_time_ms=p95,
+        )
+        for start, total, up, avg, p95 in rows
+    ]
+
+
+async def _rollup_series(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    from_ts: datetime,
+    to_ts: datetime,
+    bucket_sec: int,
+    granularity_sec: int,
+    rollup_from: datetime,
+    rollup_to: datetime,
+) -> list[CheckSeriesPoint]:
+    """
+    Series from rollups of `granularity_sec` in [rollup_from, rollup_to),
+    the partial edges and the live window are folded in from raw rows
+    """
+    buckets: dict[datetime, _SeriesBucket] = {}
+
+    def bucket(ts: datetime) -> _SeriesBucket:
+        start = floor_ts(ts, bucket_sec)
+        if start not in buckets:
+            buckets[start] = _SeriesBucket()
+        return buckets[start]
+
+    rollups = await db.scalars(
+        select(CheckResultRollup).where(
+            CheckResultRollup.monitor_id == monitor_id,
+            CheckResultRollup.bucket_sec == granularity_sec,
+            CheckResultRollup.bucket_start >= rollup_from,
+            CheckResultRollup.bucket_start < rollup_to,
+        )
+    )
+    for rollup in rollups:
+        bucket(rollup.bucket_start).add_rollup(rollup)
+
+    raw_segments = [
+        (start, end)
+        for start, end in ((from_ts, rollup_from), (rollup_to, to_ts))
+        if start < end or end == to_ts
+    ]
+    checks = await db.execute(
+        select(
+            CheckResult.checked_at,
+            CheckResult.is_up,
+            CheckResult.response_time_ms,
+        ).where(
+            CheckResult.monitor_id == monitor_id,
+            raw_segments_filter(raw_segments, to_ts),
+        )
+    )
+    for checked_at, is_up, response_time_ms in checks:
+        bucket(checked_at).add_check(is_up, response_time_ms)
+
+    return [buckets[start].to_point(start) for start in sorted(buckets)]
+
+
+async def get_check_series(
+    db: AsyncSession,
+    monitor_id: uuid.UUID,
+    from_ts: datetime,
+    to_ts: datetime,
+    bucket_sec: int,
+    now: datetime | None = None,
+) -> CheckSeries:
+    """
+    Checks in [from_ts, to_ts] bucketed by `bucket_sec`, one point per
+    non-empty bucket. Taken from the coarsest rollups dividing the bucket
+    if they are still retained, otherwise aggregated over raw rows
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+
+    granularity_sec = next((g for g in GRANULARITIES_SEC if bucket_sec % g == 0), None)
+    points = None
+
+    if granularity_sec is not None:
+        rollup_from = ceil_ts(from_ts, granularity_sec)
+        rollup_to = floor_ts(
+            min(to_ts, now - timedelta(seconds=settings.rollup_live_window_sec)),
+            granularity_sec,
+        )
+        retention_days = rollup_retention_days().get(granularity_sec)
+        retained = retention_days is None or rollup_from >= now - timedelta(
+            days=retention_days
+        )
+        if rollup_from < rollup_to and retained:
+            points = await _rollup_series(
+                db,
+                monitor_id,
+                from_ts,
+                to_ts,
+                bucket_sec,
+                granularity_sec,
+                rollup_from,
+                rollup_to,
+            )
+
+    if points is None:
+        points = await _raw_series(db, monitor_id, from_ts, to_ts, bucket_sec)
+
+    return CheckSeries(
+        monitor_id=monitor_id,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        bucket_sec=bucket_sec,
+        points=points,
+    )
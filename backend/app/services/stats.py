@@ -1,103 +1,765 @@
+import asyncio
 import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Sequence
 
-from sqlalchemy import select
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import DateTime, Text, and_, cast, func, literal, select, true
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
+from app.core.local_cache import LocalCache
 from app.core.redis_client import get_redis_client
-from app.models import CheckResult
+from app.db.session import async_session_maker
+from app.models import CheckResult, CheckResultRollup
 from app.schemas.monitor import MonitorStats
+from app.services.rollups import (
+    StatsAggregate,
+    aggregate_checks,
+    aggregate_raw_checks,
+    ceil_ts,
+    floor_ts,
+)
 
+if TYPE_CHECKING:
+    from app.services.result_writer import PendingCheckResult
 
-async def compute_monitor_stats(
-    db: AsyncSession,
-    monitor_id,
-    *,
-    from_ts: datetime | None = None,
-    to_ts: datetime | None = None,
-) -> MonitorStats:
+logger = logging.getLogger("app.stats")
+
+STATS_WINDOW = timedelta(hours=24)
+
+# hot default stats in the worker's memory, in front of the Redis snapshot
+stats_local_cache = LocalCache(
+    "stats",
+    get_settings().local_cache_max_entries,
+    get_settings().local_cache_stats_ttl_sec,
+)
+
+# custom ranges are built from cached hour buckets, which no longer change
+STATS_BUCKET_SEC = 60 * 60
+
+# Sliding window of the default 24h stats, one hash per monitor:
+#   seeding                 - token of the reader filling the hash from db
+#   seeded                  - the hash was filled from db, increments are applied
+#   snap_xmin/xmax/xip      - db snapshot the hash was filled from
+#   m:<minute>:t/u/s/c      - total, up checks, response time sum / count per minute
+#   last_at/last_up/last_code - latest check
+# Increments carry the id of the transaction which wrote their checks:
+# those visible in the seed snapshot are in the hash already and skipped,
+# those arriving while the hash is seeded wait in a list until the snapshot
+# is known. Without a seed, increments are dropped
+_STATS_WINDOW_LUA = """
+local function visible_in_seed(key, xid)
+    local snap = redis.call('HMGET', key, 'snap_xmin', 'snap_xmax', 'snap_xip')
+    if tonumber(xid) < tonumber(snap[1]) then
+        return true
+    end
+    if tonumber(xid) >= tonumber(snap[2]) then
+        return false
+    end
+    return string.find(snap[3], ',' .. xid .. ',', 1, true) ~= nil
+end
+
+local function add_checks(key, minute, t, u, s, c, last_at, last_up, last_code)
+    local m = 'm:' .. minute
+    redis.call('HINCRBY', key, m .. ':t', t)
+    redis.call('HINCRBY', key, m .. ':u', u)
+    redis.call('HINCRBY', key, m .. ':s', s)
+    redis.call('HINCRBY', key, m .. ':c', c)
+    local prev_at = tonumber(redis.call('HGET', key, 'last_at') or '0')
+    if tonumber(last_at) > prev_at then
+        redis.call('HSET', key, 'last_at', last_at, 'last_up', last_up,
+                   'last_code', last_code)
+    end
+end
+"""
+
+# KEYS: window, pending increments
+# ARGV: ttl, minute, t, u, s, c, last_at, last_up, last_code, xid
+_RECORD_CHECKS_LUA = (
+    _STATS_WINDOW_LUA
+    + """
+local state = redis.call('HMGET', KEYS[1], 'seeded', 'seeding')
+if state[1] then
+    if visible_in_seed(KEYS[1], ARGV[10]) then
+        return 0
+    end
+    add_checks(KEYS[1], unpack(ARGV, 2, 9))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    return 1
+end
+if state[2] then
+    redis.call('RPUSH', KEYS[2], cjson.encode(ARGV))
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+    return 2
+end
+return 0
+"""
+)
+
+# KEYS: window, pending increments; ARGV: token, ttl
+_BEGIN_SEED_LUA = """
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('HSET', KEYS[1], 'seeding', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# KEYS: window, pending increments
+# ARGV: token, ttl, xmin, xmax, xip, field / value pairs read from db
+_FINISH_SEED_LUA = (
+    _STATS_WINDOW_LUA
+    + """
+if redis.call('HGET', KEYS[1], 'seeding') ~= ARGV[1] then
+    return 0
+end
+redis.call('HDEL', KEYS[1], 'seeding')
+redis.call('HSET', KEYS[1], 'seeded', '1', 'snap_xmin', ARGV[3],
+           'snap_xmax', ARGV[4], 'snap_xip', ARGV[5])
+for i = 6, #ARGV, 2 do
+    redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+for _, pending in ipairs(redis.call('LRANGE', KEYS[2], 0, -1)) do
+    local args = cjson.decode(pending)
+    if not visible_in_seed(KEYS[1], args[10]) then
+        add_checks(KEYS[1], unpack(args, 2, 9))
+    end
+end
+redis.call('DEL', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+)
+
+
+# compare-and-delete: only the holder releases the recompute lock
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# in-process single-flight: one lookup / recomputation per key at a time
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def stats_cache_key(monitor_id) -> str:
+    return f"monitor:{monitor_id}:stats:last_24h"
+
+
+def stats_pending_key(monitor_id) -> str:
+    return f"monitor:{monitor_id}:stats:last_24h:pending"
+
+
+def stats_snapshot_key(monitor_id) -> str:
+    return f"monitor:{monitor_id}:stats:last_24h:snapshot"
+
+
+def stats_bucket_key(monitor_id, bucket_start: datetime) -> str:
+    return f"monitor:{monitor_id}:stats:h:{int(bucket_start.timestamp())}"
+
+
+async def get_or_compute_cached(
+    redis_client: Redis,
+    key: str,
+    compute: Callable[[], Awaitable[str]],
+    ttl_sec: float,
+    stale_sec: float,
+    lock_timeout_sec: float = 10.0,
+    beta: float = 1.0,
+) -> str:
     """
-    Calculate stats of monitor's checks for period.
-    if from_ts / to_ts is None - period = last 24 hours
+    Cached value of `key`, recomputed by one caller at a time:
+    - concurrent callers in the process share one lookup (single-flight)
+    - across processes recomputation is guarded by a Redis lock,
+      the others serve the stale value meanwhile or wait for the fresh one
+    - the value is refreshed a bit before it expires, earlier for slow
+      computations (probabilistic early expiry, XFetch)
     """
-    settings = get_settings()
-    redis_client = await get_redis_client()
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(
+            _get_or_compute(
+                redis_client, key, compute, ttl_sec, stale_sec, lock_timeout_sec, beta
+            )
+        )
+        _inflight[key] = task
+        task.add_done_callback(
+            lambda done: _inflight.pop(key) if _inflight.get(key) is done else None
+        )
+    # a cancelled caller doesn't cancel the lookup of others
+    return await asyncio.shield(task)
 
-    # --- set range if parameters is None
-    now = datetime.now(timezone.utc)
 
-    use_cache = from_ts is None and to_ts is None
+def _should_refresh(entry: dict, now: float, beta: float) -> bool:
+    # 1 - random() is in (0, 1]: log is defined
+    early_by = -entry["delta"] * beta * math.log(1.0 - random.random())
+    return now + early_by >= entry["expiry"]
 
-    if to_ts is None:
-        to_ts = now
-    if from_ts is None:
-        from_ts = to_ts - timedelta(hours=24)
 
-    cache_key = f"monitor:{monitor_id}:stats:last_24h"
+async def _get_or_compute(
+    redis_client: Redis,
+    key: str,
+    compute: Callable[[], Awaitable[str]],
+    ttl_sec: float,
+    stale_sec: float,
+    lock_timeout_sec: float,
+    beta: float,
+) -> str:
+    cached = await redis_client.get(key)
+    entry = json.loads(cached) if cached else None
+    if entry is not None and not _should_refresh(entry, time.time(), beta):
+        return entry["value"]
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    locked = await redis_client.set(
+        lock_key, token, nx=True, px=int(lock_timeout_sec * 1000)
+    )
+    if locked:
+        try:
+            started = time.monotonic()
+            value = await compute()
+            entry = {
+                "value": value,
+                "delta": time.monotonic() - started,
+                "expiry": time.time() + ttl_sec,
+            }
+            # stale copy outlives expiry for stale-while-revalidate
+            await redis_client.set(
+                key, json.dumps(entry), ex=math.ceil(ttl_sec + stale_sec)
+            )
+            return value
+        finally:
+            await redis_client.eval(_RELEASE_LOCK_LUA, 1, lock_key, token)
 
-    # 1 - try to get of cache
-    if use_cache:
-        cached = await redis_client.get(cache_key)
+    if entry is not None:
+        # stale-while-revalidate: lock holder is recomputing
+        return entry["value"]
+
+    # cold key: wait for the lock holder instead of running the same query
+    deadline = time.monotonic() + lock_timeout_sec
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        cached = await redis_client.get(key)
         if cached:
-            data = json.loads(cached)
-            return MonitorStats(**data)
+            return json.loads(cached)["value"]
 
-    # 2 - query for results in range (from db)
-    base_q = (
-        select(CheckResult)
-        .where(
-            CheckResult.monitor_id == monitor_id,
-            CheckResult.checked_at >= from_ts,
-            CheckResult.checked_at <= to_ts,
-        )
-        .order_by(CheckResult.checked_at.desc())
-    )
+    logger.warning(f"No value of {key} after {lock_timeout_sec}s, computing it")
+    return await compute()
 
-    results = (await db.scalars(base_q)).all()
 
-    total_checks = len(results)
-    up_checks = sum(1 for r in results if r.is_up)
-    down_checks = total_checks - up_checks
+def stats_window_start(now: datetime) -> datetime:
+    """Window is aligned to minutes: the cache keeps per-minute counters"""
+    return floor_ts(now - STATS_WINDOW, 60)
 
-    uptime_percent = (up_checks / total_checks * 100.0) if total_checks > 0 else 0.0
 
-    # --- average response time in range
-    response_times = [r.response_time_ms for r in results if r is not None]
-    if response_times:
-        avg_response_time_ms: float | None = sum(response_times) / len(response_times)
-    else:
-        avg_response_time_ms = None
+async def query_monitor_stats(
+    db: AsyncSession,
+    monitor_id,
+    from_ts: datetime,
+    to_ts: datetime,
+) -> MonitorStats:
+    """
+    Aggregate checks in range on db side: constant memory for any range,
+    long ranges are answered from rollups
+    """
+    aggregate = await aggregate_checks(db, monitor_id, from_ts, to_ts)
+    last = await _get_last_check(db, monitor_id, from_ts, to_ts)
+    return _build_stats(monitor_id, from_ts, to_ts, aggregate, last)
 
-    # --- last result
-    if results:
-        last = results[0]
-        last_status_up = last.is_up
-        last_status_code = last.status_code
-        last_check_at = last.checked_at
-    else:
-        last_status_up = last_status_code = last_check_at = None
 
-    stats = MonitorStats(
+async def _get_last_check(db: AsyncSession, monitor_id, from_ts, to_ts):
+    """Last result: one row from (monitor_id, checked_at) index"""
+    return (
+        await db.execute(
+            select(
+                CheckResult.is_up,
+                CheckResult.status_code,
+                CheckResult.checked_at,
+            )
+            .where(
+                CheckResult.monitor_id == monitor_id,
+                CheckResult.checked_at >= from_ts,
+                CheckResult.checked_at <= to_ts,
+            )
+            .order_by(CheckResult.checked_at.desc())
+            .limit(1)
+        )
+    ).first()
+
+
+def _build_stats(
+    monitor_id, from_ts: datetime, to_ts: datetime, aggregate: StatsAggregate, last
+) -> MonitorStats:
+    total_checks = aggregate.total_checks
+    up_checks = aggregate.up_checks
+    last_status_up, last_status_code, last_check_at = last or (None, None, None)
+
+    return MonitorStats(
         monitor_id=str(monitor_id),
         from_ts=from_ts,
         to_ts=to_ts,
         total_checks=total_checks,
         up_checks=up_checks,
-        down_checks=down_checks,
-        uptime_percent=uptime_percent,
-        avg_response_time_ms=avg_response_time_ms,
+        down_checks=total_checks - up_checks,
+        uptime_percent=(up_checks / total_checks * 100.0) if total_checks else 0.0,
+        avg_response_time_ms=aggregate.avg_response_time_ms,
         last_status_up=last_status_up,
         last_status_code=last_status_code,
         last_check_at=last_check_at,
     )
 
-    # 3 - put in cache (if period is default)
-    if use_cache:
-        await redis_client.setex(
-            cache_key,
-            settings.cache_ttl_monitor_stats_sec,
-            stats.model_dump_json(),
+
+async def _query_stats_buckets(
+    db: AsyncSession, monitor_id, bucket_starts: list[datetime]
+) -> dict[datetime, dict]:
+    """
+    Aggregates of past hour buckets from hour rollups
+    with the last check of every bucket, in one query
+    """
+    buckets = (
+        func.unnest(literal(bucket_starts, ARRAY(DateTime(timezone=True))))
+        .table_valued("bucket_start")
+        .render_derived(name="buckets")
+    )
+    last = (
+        select(CheckResult.is_up, CheckResult.status_code, CheckResult.checked_at)
+        .where(
+            CheckResult.monitor_id == monitor_id,
+            CheckResult.checked_at >= buckets.c.bucket_start,
+            CheckResult.checked_at
+            < buckets.c.bucket_start + timedelta(seconds=STATS_BUCKET_SEC),
         )
+        .order_by(CheckResult.checked_at.desc())
+        .limit(1)
+        .lateral("last")
+    )
+    rows = await db.execute(
+        select(
+            buckets.c.bucket_start,
+            CheckResultRollup.total_checks,
+            CheckResultRollup.up_checks,
+            CheckResultRollup.response_time_sum,
+            CheckResultRollup.response_time_count,
+            CheckResultRollup.response_time_min,
+            CheckResultRollup.response_time_max,
+            last.c.is_up,
+            last.c.status_code,
+            last.c.checked_at,
+        )
+        .select_from(buckets)
+        .outerjoin(
+            CheckResultRollup,
+            and_(
+                CheckResultRollup.monitor_id == monitor_id,
+                CheckResultRollup.bucket_sec == STATS_BUCKET_SEC,
+                CheckResultRollup.bucket_start == buckets.c.bucket_start,
+            ),
+        )
+        .outerjoin(last, true())
+    )
+
+    result = {}
+    for start, total, up, rt_sum, rt_count, rt_min, rt_max, *last_row in rows:
+        result[start] = {
+            "aggregate": [
+                total or 0,
+                up or 0,
+                rt_sum or 0,
+                rt_count or 0,
+                rt_min,
+                rt_max,
+            ],
+            "last": (
+                None
+                if last_row[2] is None
+                else [last_row[0], last_row[1], last_row[2].isoformat()]
+            ),
+        }
+    return result
+
+
+async def query_ranged_stats_cached(
+    db: AsyncSession,
+    redis_client: Redis,
+    monitor_id,
+    from_ts: datetime,
+    to_ts: datetime,
+    now: datetime | None = None,
+) -> MonitorStats:
+    """
+    Stats of a custom range: whole past hours come from cached buckets
+    (computed once, they don't change any more), the partial first hour
+    and the live tail are aggregated from raw rows
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+
+    buckets_from = ceil_ts(from_ts, STATS_BUCKET_SEC)
+    buckets_to = floor_ts(
+        min(to_ts, now - timedelta(seconds=settings.rollup_live_window_sec)),
+        STATS_BUCKET_SEC,
+    )
+    retained_from = now - timedelta(days=settings.rollup_hour_retention_days)
+    if buckets_from >= buckets_to or buckets_from < retained_from:
+        return await query_monitor_stats(db, monitor_id, from_ts, to_ts)
+
+    step = timedelta(seconds=STATS_BUCKET_SEC)
+    starts = [
+        buckets_from + i * step for i in range(int((buckets_to - buckets_from) / step))
+    ]
+    cached = await redis_client.mget(
+        [stats_bucket_key(monitor_id, start) for start in starts]
+    )
+    buckets = {
+        start: json.loads(raw) for start, raw in zip(starts, cached) if raw is not None
+    }
+
+    missing = [start for start in starts if start not in buckets]
+    if missing:
+        computed = await _query_stats_buckets(db, monitor_id, missing)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for start, bucket in computed.items():
+                pipe.set(
+                    stats_bucket_key(monitor_id, start),
+                    json.dumps(bucket),
+                    ex=settings.stats_bucket_cache_ttl_sec,
+                )
+            await pipe.execute()
+        buckets.update(computed)
+
+    aggregate = StatsAggregate()
+    for start in starts:
+        aggregate += StatsAggregate(*buckets[start]["aggregate"])
+
+    edges = [(buckets_to, to_ts)]
+    if from_ts < buckets_from:
+        edges.insert(0, (from_ts, buckets_from))
+    aggregate += await aggregate_raw_checks(db, monitor_id, edges, to_ts)
 
+    # last check: live tail, then the latest non-empty bucket, then the head
+    last = await _get_last_check(db, monitor_id, buckets_to, to_ts)
+    if last is None:
+        for start in reversed(starts):
+            if buckets[start]["last"]:
+                is_up, status_code, checked_at = buckets[start]["last"]
+                last = (is_up, status_code, datetime.fromisoformat(checked_at))
+                break
+    if last is None and from_ts < buckets_from:
+        last = await _get_last_check(db, monitor_id, from_ts, buckets_from)
+
+    return _build_stats(monitor_id, from_ts, to_ts, aggregate, last)
+
+
+def _stats_from_window(
+    fields: dict[str, str], monitor_id, window_start: datetime, now: datetime
+) -> tuple[MonitorStats, list[str]]:
+    """Stats of the cached window and fields of minutes which left it"""
+    start_minute = int(window_start.timestamp())
+    totals = {"t": 0, "u": 0, "s": 0, "c": 0}
+    stale = []
+
+    for name, value in fields.items():
+        if not name.startswith("m:"):
+            continue
+        _, minute, counter = name.split(":")
+        if int(minute) < start_minute:
+            stale.append(name)
+        else:
+            totals[counter] += int(value)
+
+    aggregate = StatsAggregate(
+        total_checks=totals["t"],
+        up_checks=totals["u"],
+        response_time_sum=totals["s"],
+        response_time_count=totals["c"],
+    )
+
+    last = None
+    if fields.get("last_at"):
+        last_at = datetime.fromtimestamp(float(fields["last_at"]), tz=timezone.utc)
+        if last_at >= window_start:
+            last_code = int(fields["last_code"]) if fields["last_code"] else None
+            last = (fields["last_up"] == "1", last_code, last_at)
+
+    stats = _build_stats(monitor_id, window_start, now, aggregate, last)
+    return stats, stale
+
+
+def _last_fields(checked_at: datetime, is_up: bool, status_code) -> dict[str, str]:
+    return {
+        "last_at": repr(checked_at.timestamp()),
+        "last_up": "1" if is_up else "0",
+        "last_code": "" if status_code is None else str(status_code),
+    }
+
+
+async def get_cached_stats(
+    redis_client: Redis, monitor_id, now: datetime
+) -> MonitorStats | None:
+    """Default 24h stats from the sliding window, None if it isn't seeded"""
+    key = stats_cache_key(monitor_id)
+    fields = await redis_client.hgetall(key)
+    if not fields.get("seeded"):
+        return None
+
+    stats, stale = _stats_from_window(fields, monitor_id, stats_window_start(now), now)
+    if stale:
+        await redis_client.hdel(key, *stale)
     return stats
+
+
+async def current_xact_id(db: AsyncSession) -> int:
+    """Id of the running transaction, the version of checks it writes"""
+    return int(await db.scalar(select(cast(func.pg_current_xact_id(), Text))))
+
+
+def _parse_snapshot(snapshot: str) -> tuple[int, int, str]:
+    """`xmin:xmax:xip,...` of pg_current_snapshot, xip as `,xid,...,`"""
+    xmin, xmax, xip = snapshot.split(":")
+    return int(xmin), int(xmax), f",{xip},"
+
+
+async def seed_stats_cache(
+    db: AsyncSession, redis_client: Redis, monitor_id, now: datetime
+) -> MonitorStats:
+    """
+    Fill the sliding window from minute rollups. Increments recorded
+    meanwhile are applied once it's filled, unless the rollups had them
+    """
+    settings = get_settings()
+    window_start = stats_window_start(now)
+    keys = [stats_cache_key(monitor_id), stats_pending_key(monitor_id)]
+    token = uuid.uuid4().hex
+    await redis_client.eval(
+        _BEGIN_SEED_LUA, 2, *keys, token, settings.stats_cache_ttl_sec
+    )
+
+    # the snapshot is of the same statement as the rollups
+    snapshot = select(
+        cast(func.pg_current_snapshot(), Text).label("snapshot")
+    ).subquery()
+    rows = (
+        await db.execute(
+            select(
+                snapshot.c.snapshot,
+                CheckResultRollup.bucket_start,
+                CheckResultRollup.total_checks,
+                CheckResultRollup.up_checks,
+                CheckResultRollup.response_time_sum,
+                CheckResultRollup.response_time_count,
+            )
+            .select_from(snapshot)
+            .outerjoin(
+                CheckResultRollup,
+                and_(
+                    CheckResultRollup.monitor_id == monitor_id,
+                    CheckResultRollup.bucket_sec == 60,
+                    CheckResultRollup.bucket_start >= window_start,
+                ),
+            )
+        )
+    ).all()
+    fields = {}
+    for _, bucket_start, total, up, rt_sum, rt_count in rows:
+        if bucket_start is None:
+            continue
+        minute = int(bucket_start.timestamp())
+        fields[f"m:{minute}:t"] = str(total)
+        fields[f"m:{minute}:u"] = str(up)
+        fields[f"m:{minute}:s"] = str(rt_sum)
+        fields[f"m:{minute}:c"] = str(rt_count)
+
+    last = await _get_last_check(db, monitor_id, window_start, now)
+    if last:
+        is_up, status_code, checked_at = last
+        fields.update(_last_fields(checked_at, is_up, status_code))
+
+    seeded = await redis_client.eval(
+        _FINISH_SEED_LUA,
+        2,
+        *keys,
+        token,
+        settings.stats_cache_ttl_sec,
+        *_parse_snapshot(rows[0][0]),
+        *(item for field in fields.items() for item in field),
+    )
+    if not seeded:
+        logger.info("Stats cache of monitor %s is seeded by another reader", monitor_id)
+
+    stats, _ = _stats_from_window(fields, monitor_id, window_start, now)
+    return stats
+
+
+async def record_checks_in_stats_cache(
+    redis_client: Redis, pending: Sequence["PendingCheckResult"], xact_id: int
+) -> None:
+    """
+    Write-through: add fresh results, written by transaction `xact_id`,
+    to the sliding windows of their monitors, one round-trip for the whole batch
+    """
+    settings = get_settings()
+
+    per_minute: dict[tuple[uuid.UUID, int], list[int]] = {}
+    last: dict[uuid.UUID, "PendingCheckResult"] = {}
+    for item in pending:
+        minute = int(floor_ts(item.checked_at, 60).timestamp())
+        counters = per_minute.setdefault((item.monitor_id, minute), [0, 0, 0, 0])
+        counters[0] += 1
+        counters[1] += int(item.is_up)
+        if item.response_time_ms is not None:
+            counters[2] += item.response_time_ms
+            counters[3] += 1
+        latest = last.get(item.monitor_id)
+        if latest is None or item.checked_at > latest.checked_at:
+            last[item.monitor_id] = item
+
+    record_checks = redis_client.register_script(_RECORD_CHECKS_LUA)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for (monitor_id, minute), counters in per_minute.items():
+            latest = last[monitor_id]
+            last_fields = _last_fields(
+                latest.checked_at, latest.is_up, latest.status_code
+            )
+            await record_checks(
+                keys=[stats_cache_key(monitor_id), stats_pending_key(monitor_id)],
+                args=[
+                    settings.stats_cache_ttl_sec,
+                    minute,
+                    *counters,
+                    last_fields["last_at"],
+                    last_fields["last_up"],
+                    last_fields["last_code"],
+                    xact_id,
+                ],
+                client=pipe,
+            )
+        await pipe.execute()
+
+
+async def verify_stats_cache(db: AsyncSession, monitor_id) -> bool:
+    """
+    Consistency check: compare the cached window with the same range in db.
+    On mismatch the cache is dropped in Redis and in every worker,
+    the next reader seeds it again
+    """
+    redis_client = get_redis_client()
+    now = datetime.now(timezone.utc)
+
+    cached = await get_cached_stats(redis_client, monitor_id, now)
+    if cached is None:
+        return True
+
+    actual = await query_monitor_stats(db, monitor_id, cached.from_ts, cached.to_ts)
+    mismatched = [
+        field
+        for field in ("total_checks", "up_checks", "last_check_at")
+        if getattr(cached, field) != getattr(actual, field)
+    ]
+    cached_avg, actual_avg = cached.avg_response_time_ms, actual.avg_response_time_ms
+    if (cached_avg is None or actual_avg is None) and cached_avg is not actual_avg:
+        mismatched.append("avg_response_time_ms")
+    elif cached_avg is not None and not math.isclose(cached_avg, actual_avg):
+        mismatched.append("avg_response_time_ms")
+
+    if not mismatched:
+        return True
+
+    logger.warning(
+        "Stats cache of monitor %s is out of sync (%s): cached %s, db %s",
+        monitor_id,
+        ", ".join(mismatched),
+        cached.model_dump(include=set(mismatched)),
+        actual.model_dump(include=set(mismatched)),
+    )
+    await redis_client.delete(
+        stats_cache_key(monitor_id), stats_snapshot_key(monitor_id)
+    )
+    await stats_local_cache.invalidate(str(monitor_id))
+    return False
+
+
+async def _window_stats_cached(monitor_id) -> MonitorStats:
+    """Default 24h stats: worker memory, then the snapshot of the window"""
+    settings = get_settings()
+    cached = stats_local_cache.get(str(monitor_id))
+    if cached is not None:
+        return cached.model_copy()
+
+    redis_client = get_redis_client()
+
+    async def window_stats() -> str:
+        now = datetime.now(timezone.utc)
+        stats = await get_cached_stats(redis_client, monitor_id, now)
+        if stats is None:
+            # shared by concurrent readers: outlives the session of any of them
+            async with async_session_maker() as db:
+                stats = await seed_stats_cache(db, redis_client, monitor_id, now)
+        return stats.model_dump_json()
+
+    # short-lived snapshot of the window, shared by concurrent readers
+    snapshot = await get_or_compute_cached(
+        redis_client,
+        stats_snapshot_key(monitor_id),
+        window_stats,
+        ttl_sec=settings.stats_snapshot_ttl_sec,
+        stale_sec=settings.stats_snapshot_stale_sec,
+    )
+    stats = MonitorStats.model_validate_json(snapshot)
+    stats_local_cache.set(str(monitor_id), stats)
+    return stats.model_copy()
+
+
+async def _ranged_stats(
+    db: AsyncSession, monitor_id, from_ts: datetime, to_ts: datetime, now: datetime
+) -> MonitorStats:
+    """Stats of a range from cached hour buckets, from db without Redis"""
+    try:
+        return await query_ranged_stats_cached(
+            db, get_redis_client(), monitor_id, from_ts, to_ts, now
+        )
+    except RedisError as exc:
+        logger.warning(f"Stats cache is unavailable: {exc}")
+
+    # aggregate results in range (in db)
+    return await query_monitor_stats(db, monitor_id, from_ts, to_ts)
+
+
+async def compute_monitor_stats(
+    db: AsyncSession,
+    monitor_id,
+    *,
+    from_ts: datetime | None = None,
+    to_ts: datetime | None = None,
+) -> MonitorStats:
+    """
+    Calculate stats of monitor's checks for period.
+    if from_ts / to_ts is None - period = last 24 hours,
+    served from the sliding window kept up to date by the check path
+    through a snapshot guarded against stampedes
+    """
+    now = datetime.now(timezone.utc)
+
+    if from_ts is None and to_ts is None:
+        try:
+            return await _window_stats_cached(monitor_id)
+        except RedisError as exc:
+            logger.warning(f"Stats cache is unavailable: {exc}")
+
+    # --- set range if parameters is None
+    if to_ts is None:
+        to_ts = now
+    if from_ts is None:
+        from_ts = to_ts - STATS_WINDOW
+
+    return await _ranged_stats(db, monitor_id, from_ts, to_ts, now)
@@ -1 +1,10 @@
-from .monitors import run_monitor_check, schedule_due_monitors  # noqa: F401
+from .maintenance import (  # noqa: F401
+    maintain_check_result_partitions,
+    purge_expired_rollups_task,
+    verify_stats_cache_task,
+)
+from .monitors import (  # noqa: F401
+    run_monitor_check,
+    run_monitor_checks_batch,
+    schedule_due_monitors,
+)
@@ -0,0 +1,41 @@
+import asyncio
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import get_settings
+from app.core.http_client import close_http_client
+
+settings = get_settings()
+
+# pool lives as long as the event loop of worker process (see run_async)
+celery_engine = create_async_engine(
+    str(settings.database_url),
+    pool_size=settings.celery_db_pool_size,
+    pool_pre_ping=True,
+)
+
+CelerySessionLocal = async_sessionmaker(bind=celery_engine, expire_on_commit=False)
+
+# one event loop per worker process, kept between tasks,
+# so pooled connections of shared http-client are reused
+_runner: asyncio.Runner | None = None
+
+
+def run_async(coro):
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner()
+    return _runner.run(coro)
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _close_worker_event_loop(**kwargs) -> None:
+    global _runner
+    if _runner is None:
+        return
+    _runner.run(close_http_client())
+    _runner.run(celery_engine.dispose())
+    _runner.close()
+    _runner = None
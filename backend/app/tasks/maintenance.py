@@ -0,0 +1,70 @@
+from celery.utils.log import get_task_logger
+
+from app.core.celery_app import celery_app
+from app.core.config import get_settings
+from app.core.security import delete_expired_refresh_tokens
+from app.crud.monitor import get_random_active_monitor_ids
+from app.services.partitions import (
+    drop_expired_check_result_partitions,
+    ensure_check_result_partitions,
+)
+from app.services.rollups import purge_expired_rollups
+from app.services.stats import verify_stats_cache
+from app.tasks.base import CelerySessionLocal, run_async
+
+logger = get_task_logger(__name__)
+
+
+async def _maintain_check_result_partitions_logic():
+    async with CelerySessionLocal() as db:
+        await ensure_check_result_partitions(db)
+        await drop_expired_check_result_partitions(db)
+
+
+@celery_app.task
+def maintain_check_result_partitions() -> None:
+    run_async(_maintain_check_result_partitions_logic())
+
+
+async def _purge_expired_rollups_logic():
+    async with CelerySessionLocal() as db:
+        deleted = await purge_expired_rollups(db)
+    logger.info("Purged %s expired rollup buckets", deleted)
+
+
+@celery_app.task
+def purge_expired_rollups_task() -> None:
+    run_async(_purge_expired_rollups_logic())
+
+
+async def _verify_stats_cache_logic():
+    settings = get_settings()
+    async with CelerySessionLocal() as db:
+        monitor_ids = await get_random_active_monitor_ids(
+            db, settings.stats_cache_verify_sample
+        )
+        out_of_sync = 0
+        for monitor_id in monitor_ids:
+            if not await verify_stats_cache(db, monitor_id):
+                out_of_sync += 1
+    logger.info(
+        "Verified stats cache of %s monitors, %s out of sync",
+        len(monitor_ids),
+        out_of_sync,
+    )
+
+
+@celery_app.task
+def verify_stats_cache_task() -> None:
+    run_async(_verify_stats_cache_logic())
+
+
+async def _purge_expired_refresh_tokens_logic():
+    async with CelerySessionLocal() as db:
+        deleted = await delete_expired_refresh_tokens(db)
+    logger.info("Purged %s expired refresh tokens", deleted)
+
+
+@celery_app.task
+def purge_expired_refresh_tokens_task() -> None:
+    run_async(_purge_expired_refresh_tokens_logic())
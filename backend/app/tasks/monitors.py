@@ -1,30 +1,31 @@
-import asyncio
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from celery.utils.log import get_task_logger
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
-
 
 from app.core.celery_app import celery_app
 from app.core.config import get_settings
-from app.crud.monitor import get_monitor
-from app.models import CheckResult, Monitor
-from app.services.monitoring import check_monitor_once
+from app.core.redis_client import get_redis_client
+from app.crud.monitor import (
+    get_active_monitors_by_ids,
+    get_due_monitor_runs,
+    get_monitor,
+)
+from app.services.dispatch import (
+    claim_dispatch,
+    inflight_ttl_sec,
+    new_dispatch_token,
+    release_dispatch,
+)
+from app.services.monitoring import check_monitor_once, probe_monitors
+from app.services.result_writer import CheckResultWriter
+from app.services.schedule import plan_dispatch
+from app.tasks.base import CelerySessionLocal, run_async
 
 logger = get_task_logger(__name__)
 
 settings = get_settings()
 
-celery_engine = create_async_engine(
-    str(settings.database_url),
-    poolclass=NullPool,
-)
-
-CelerySessionLocal = async_sessionmaker(bind=celery_engine, expire_on_commit=False)
-
 
 async def _run_monitor_check_logic(monitor_id: str):
     monitor_uuid = uuid.UUID(monitor_id)
@@ -35,44 +36,72 @@ async def _run_monitor_check_logic(monitor_id: str):
         await check_monitor_once(db, monitor)
 
 
-async def _schedule_due_monitors_logic():
-    async with CelerySessionLocal() as db:
-        now = datetime.now(timezone.utc)
-        monitors = (
-            await db.scalars(select(Monitor).where(Monitor.is_active.is_(True)))
-        ).all()
-
-        for monitor in monitors:
-            last_result = await db.scalar(
-                select(CheckResult)
-                .where(CheckResult.monitor_id == monitor.id)
-                .order_by(CheckResult.checked_at.desc())
-                .limit(1)
+async def _run_monitor_checks_batch_logic(monitor_ids: list[str], token: str | None):
+    monitor_uuids = [uuid.UUID(monitor_id) for monitor_id in monitor_ids]
+    try:
+        async with CelerySessionLocal() as db:
+            monitors = await get_active_monitors_by_ids(db, monitor_uuids)
+
+        # results are written in bulk by size / time threshold,
+        # the rest is flushed before the task ends
+        async with CheckResultWriter(
+            CelerySessionLocal,
+            max_batch=settings.result_writer_batch_size,
+            flush_interval_sec=settings.result_writer_flush_interval_sec,
+        ) as writer:
+            await probe_monitors(
+                monitors,
+                writer,
+                concurrency=settings.probe_concurrency,
+                per_host_concurrency=settings.probe_per_host_concurrency,
             )
+    finally:
+        # results are written, the next due run may be dispatched;
+        # batches queued without a token leave their marks to expire
+        if token is not None:
+            await release_dispatch(get_redis_client(), monitor_ids, token)
 
-            due = False
-            if last_result is None:
-                due = True
-            else:
-                last_check_time = last_result.checked_at
-                if last_check_time.tzinfo is None:
-                    last_check_time = last_check_time.replace(tzinfo=timezone.utc)
 
-                elapsed_sec = (now - last_check_time).total_seconds()
-                due = elapsed_sec >= monitor.check_interval_sec
-
-            if due:
-                run_monitor_check.delay(str(monitor.id))
+async def _schedule_due_monitors_logic():
+    async with CelerySessionLocal() as db:
+        now = datetime.now(timezone.utc)
+        # runs due before the next poll, started at their due time
+        due_runs = await get_due_monitor_runs(
+            db, now + timedelta(seconds=settings.scheduler_beat_interval_sec)
+        )
+
+    # monitors with a pending / running check stay due until it's written
+    token = new_dispatch_token()
+    claimed = set(
+        await claim_dispatch(
+            get_redis_client(),
+            [str(monitor_id) for monitor_id, _ in due_runs],
+            inflight_ttl_sec(
+                settings.probe_batch_size,
+                settings.probe_concurrency,
+                delay_sec=settings.scheduler_beat_interval_sec,
+            ),
+            token,
+        )
+    )
+    due_runs = [run for run in due_runs if str(run.id) in claimed]
+
+    for countdown, monitor_ids in plan_dispatch(
+        due_runs, now, batch_size=settings.probe_batch_size
+    ):
+        run_monitor_checks_batch.apply_async((monitor_ids, token), countdown=countdown)
 
 
+@celery_app.task
+def run_monitor_check(monitor_id: str) -> None:
+    run_async(_run_monitor_check_logic(monitor_id))
 
 
 @celery_app.task
-def run_monitor_check(monitor_id: str) -> None:
-    asyncio.run(_run_monitor_check_logic(monitor_id))
+def run_monitor_checks_batch(monitor_ids: list[str], token: str | None = None) -> None:
+    run_async(_run_monitor_checks_batch_logic(monitor_ids, token))
 
 
 @celery_app.task
 def schedule_due_monitors() -> None:
-    asyncio.run(_schedule_due_monitors_logic())
-
+    run_async(_schedule_due_monitors_logic())
@@ -0,0 +1,158 @@
+"""
+Checks per second per core: Celery paths vs the asyncio probe runner.
+
+    celery task   - one `asyncio.run` with its own http-client per check,
+                    as `run_monitor_check` in a prefork child
+    celery batch  - `probe_monitors` over `--batch` monitors per task on the
+                    kept loop, tasks one after another, as `run_monitor_checks_batch`
+    runner        - every check started on one loop through a shared `ProbePool`,
+                    as `python -m app.probe_runner`
+
+Targets are a stub http server in another process answering after
+`--latency-ms`, spread over `--hosts` loopback addresses. Results go to
+a counting writer, no db: only probing is measured. CPU time is of this
+process, i.e. of one core.
+
+    python -m benchmarks.probe_throughput --checks 5000 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.core.config import get_settings
+from app.core.http_client import close_http_client
+from app.services.monitoring import ProbePool, perform_http_check, probe_monitors
+
+PORT = 18081
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok"
+
+
+def serve(latency_sec: float) -> None:
+    async def handle(reader, writer):
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(latency_sec)
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "0.0.0.0", PORT, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+class CountingWriter:
+    def __init__(self):
+        self.count = 0
+
+    async def add(self, item) -> None:
+        self.count += 1
+
+
+def make_monitors(count: int, hosts: int) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            target_url=f"http://127.0.{i % hosts // 250}.{i % hosts % 250 + 1}:{PORT}/",
+        )
+        for i in range(count)
+    ]
+
+
+def run_celery_task(monitors, _batch) -> int:
+    async def check(monitor):
+        try:
+            await perform_http_check(monitor.target_url)
+        finally:
+            await close_http_client()
+
+    for monitor in monitors:
+        asyncio.run(check(monitor))
+    return len(monitors)
+
+
+def run_celery_batch(monitors, batch) -> int:
+    settings = get_settings()
+    writer = CountingWriter()
+    with asyncio.Runner() as runner:
+        for i in range(0, len(monitors), batch):
+            runner.run(
+                probe_monitors(
+                    monitors[i : i + batch],
+                    writer,
+                    settings.probe_concurrency,
+                    settings.probe_per_host_concurrency,
+                )
+            )
+        runner.run(close_http_client())
+    return writer.count
+
+
+def run_runner(monitors, _batch) -> int:
+    settings = get_settings()
+    writer = CountingWriter()
+
+    async def main():
+        # same cap as ProbeRunner
+        concurrency = min(
+            settings.probe_runner_concurrency, settings.http_max_connections
+        )
+        pool = ProbePool(concurrency, settings.probe_per_host_concurrency)
+        await asyncio.gather(*(pool.probe(monitor, writer) for monitor in monitors))
+        await close_http_client()
+
+    asyncio.run(main())
+    return writer.count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--task-checks", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=get_settings().probe_batch_size)
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    # a log line per check is the same cost on every path
+    logging.disable(logging.INFO)
+
+    server = multiprocessing.Process(
+        target=serve, args=(args.latency_ms / 1000,), daemon=True
+    )
+    server.start()
+    time.sleep(0.5)
+
+    try:
+        print(f"{'path':<14} {'checks':>7} {'wall s':>8} {'checks/s':>9} {'/cpu s':>9}")
+        for name, run, count in (
+            ("celery task", run_celery_task, args.task_checks),
+            ("celery batch", run_celery_batch, args.checks),
+            ("runner", run_runner, args.checks),
+        ):
+            monitors = make_monitors(count, args.hosts)
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            done = run(monitors, args.batch)
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            print(
+                f"{name:<14} {done:>7} {wall:>8.2f} {done / wall:>9.0f}"
+                f" {done / cpu:>9.0f}"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
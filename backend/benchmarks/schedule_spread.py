@@ -0,0 +1,127 @@
+"""
+Check dispatch per second: monitors created together, scheduled from their
+creation time and polled by beat vs deterministic phase offsets, dispatched
+by beat with `plan_dispatch` and by the zset scheduler.
+
+Pure simulation, no db / Redis: `--monitors` monitors with intervals from
+`--intervals` are created within `--created-within` seconds, checks
+dispatched during `--duration` seconds are counted per second.
+
+    python -m benchmarks.schedule_spread --monitors 10000
+"""
+
+import argparse
+import heapq
+import math
+import random
+import statistics
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from app.core.schedule_phase import next_phase_run
+from app.services.schedule import plan_dispatch
+
+BEAT_INTERVAL_SEC = 15.0
+BATCH_SIZE = 100
+
+
+def make_monitors(count, intervals, created_within_sec, start):
+    rnd = random.Random(42)
+    return [
+        (
+            uuid.UUID(int=rnd.getrandbits(128), version=4),
+            rnd.choice(intervals),
+            start + timedelta(seconds=rnd.uniform(0, created_within_sec)),
+        )
+        for _ in range(count)
+    ]
+
+
+def simulate_beat_legacy(monitors, start, duration_sec) -> Counter:
+    """Due at creation, every poll dispatches all due, next = poll + interval"""
+    due = [(created, interval) for _, interval, created in monitors]
+    dispatched = Counter()
+    polls = math.ceil(duration_sec / BEAT_INTERVAL_SEC)
+    for poll in range(1, polls + 1):
+        now = start + timedelta(seconds=poll * BEAT_INTERVAL_SEC)
+        second = int((now - start).total_seconds())
+        for i, (next_at, interval) in enumerate(due):
+            if next_at <= now:
+                dispatched[second] += 1
+                due[i] = (now + timedelta(seconds=interval), interval)
+    return dispatched
+
+
+def simulate_beat_phased(monitors, start, duration_sec) -> Counter:
+    """Phase offsets, runs found by a poll are spread by `plan_dispatch`"""
+    queue = [
+        (next_phase_run(monitor_id, interval, created), monitor_id, interval)
+        for monitor_id, interval, created in monitors
+    ]
+    heapq.heapify(queue)
+    dispatched = Counter()
+    polls = math.ceil(duration_sec / BEAT_INTERVAL_SEC)
+    for poll in range(1, polls + 1):
+        now = start + timedelta(seconds=poll * BEAT_INTERVAL_SEC)
+        due_runs = []
+        # one beat ahead, as `_schedule_due_monitors_logic`
+        while queue and queue[0][0] <= now + timedelta(seconds=BEAT_INTERVAL_SEC):
+            next_at, monitor_id, interval = heapq.heappop(queue)
+            due_runs.append((monitor_id, next_at))
+            # phase-keeping advance, as in advance_monitors_schedule
+            heapq.heappush(
+                queue,
+                (next_at + timedelta(seconds=interval), monitor_id, interval),
+            )
+        for countdown, monitor_ids in plan_dispatch(due_runs, now, BATCH_SIZE):
+            second = int((now - start).total_seconds() + countdown)
+            dispatched[second] += len(monitor_ids)
+    return dispatched
+
+
+def simulate_zset_phased(monitors, start, duration_sec) -> Counter:
+    """Phase offsets, every run dispatched at its due time"""
+    dispatched = Counter()
+    end = start + timedelta(seconds=duration_sec)
+    for monitor_id, interval, created in monitors:
+        next_at = next_phase_run(monitor_id, interval, created)
+        while next_at <= end:
+            dispatched[int((next_at - start).total_seconds())] += 1
+            next_at += timedelta(seconds=interval)
+    return dispatched
+
+
+def describe(dispatched: Counter, warmup_sec: int, duration_sec: int) -> str:
+    # steady state only: seconds after every monitor was created
+    per_second = [dispatched.get(s, 0) for s in range(warmup_sec, duration_sec)]
+    ordered = sorted(per_second)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    mean, variance = statistics.fmean(per_second), statistics.pvariance(per_second)
+    return f"{mean:>8.1f} {variance:>12.1f} {p99:>6} {ordered[-1]:>6}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--monitors", type=int, default=10_000)
+    parser.add_argument("--intervals", type=int, nargs="+", default=[30, 60, 300])
+    parser.add_argument("--created-within", type=float, default=60.0)
+    parser.add_argument("--duration", type=int, default=60 * 60)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    monitors = make_monitors(args.monitors, args.intervals, args.created_within, start)
+    warmup_sec = math.ceil(args.created_within + max(args.intervals))
+
+    print(f"{'scheduling':<22} {'mean/s':>8} {'variance':>12} {'p99':>6} {'max':>6}")
+    for name, simulate in (
+        ("beat, from creation", simulate_beat_legacy),
+        ("beat, phased", simulate_beat_phased),
+        ("zset, phased", simulate_zset_phased),
+    ):
+        dispatched = simulate(monitors, start, args.duration)
+        print(f"{name:<22} {describe(dispatched, warmup_sec, args.duration)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Scheduler tick latency: per-monitor lookups vs the indexed due-queue.
+
+Seeds N monitors (with a few check results each) in one transaction,
+measures both ways of finding due monitors and rolls everything back.
+
+    python -m benchmarks.scheduler_tick --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.crud.monitor import get_due_monitor_runs
+from app.models import CheckResult, Monitor
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, is_active, is_superuser, created_at)
+    VALUES (gen_random_uuid(), 'bench-scheduler@example.com', 'x', true, false, now())
+    """,
+    """
+    INSERT INTO projects (id, name, owner_id, is_active)
+    SELECT gen_random_uuid(), 'bench', id, true
+    FROM users WHERE email = 'bench-scheduler@example.com'
+    """,
+    """
+    INSERT INTO monitors (id, project_id, name, target_url, check_interval_sec, is_active)
+    SELECT gen_random_uuid(), p.id, 'bench-' || g, 'https://example.com/', 60, true
+    FROM projects p, generate_series(1, :size) g
+    WHERE p.name = 'bench'
+    """,
+    """
+    INSERT INTO check_results (id, monitor_id, checked_at, is_up, status_code,
+                               response_time_ms)
+    SELECT gen_random_uuid(), m.id,
+           now() - (g * interval '1 minute') - (random() * interval '1 minute'),
+           true, 200, 100
+    FROM monitors m, generate_series(0, :checks_per_monitor - 1) g
+    WHERE m.name LIKE 'bench-%'
+    """,
+    """
+    UPDATE monitors AS m
+    SET last_checked_at = last.checked_at,
+        next_check_at = last.checked_at + m.check_interval_sec * INTERVAL '1 second'
+    FROM (
+        SELECT monitor_id, max(checked_at) AS checked_at
+        FROM check_results
+        GROUP BY monitor_id
+    ) AS last
+    WHERE last.monitor_id = m.id AND m.name LIKE 'bench-%'
+    """,
+]
+
+
+async def legacy_due_ids(db: AsyncSession, now: datetime) -> list:
+    """Previous scheduler logic: one latest-result query per monitor"""
+    monitors = (
+        await db.scalars(select(Monitor).where(Monitor.is_active.is_(True)))
+    ).all()
+
+    due_ids = []
+    for monitor in monitors:
+        last_result = await db.scalar(
+            select(CheckResult)
+            .where(CheckResult.monitor_id == monitor.id)
+            .order_by(CheckResult.checked_at.desc())
+            .limit(1)
+        )
+        if last_result is None or (
+            (now - last_result.checked_at).total_seconds() >= monitor.check_interval_sec
+        ):
+            due_ids.append(monitor.id)
+    return due_ids
+
+
+async def measure(fn, db: AsyncSession, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        now = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        found = len(await fn(db, now))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0, found
+
+
+async def run(sizes: list[int], checks_per_monitor: int, legacy_limit: int) -> None:
+    settings = get_settings()
+    engine = create_async_engine(settings.database_url)
+
+    print(f"{'monitors':>10} {'legacy ms':>12} {'single ms':>12} {'due':>8}")
+    for size in sizes:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            db = AsyncSession(bind=conn, expire_on_commit=False)
+            try:
+                for sql in SEED_SQL:
+                    await db.execute(
+                        text(sql),
+                        {"size": size, "checks_per_monitor": checks_per_monitor},
+                    )
+                await db.execute(text("ANALYZE monitors"))
+                await db.execute(text("ANALYZE check_results"))
+
+                if size <= legacy_limit:
+                    legacy_ms, _ = await measure(legacy_due_ids, db, repeat=1)
+                    legacy = f"{legacy_ms:12.1f}"
+                else:
+                    legacy = f"{'skipped':>12}"
+
+                single_ms, due = await measure(get_due_monitor_runs, db, repeat=3)
+                print(f"{size:>10} {legacy} {single_ms:12.1f} {due:>8}")
+            finally:
+                await db.close()
+                await trans.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--checks-per-monitor", type=int, default=5)
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=10000,
+        help="skip the per-monitor path above this many monitors",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.sizes, args.checks_per_monitor, args.legacy_limit))
+
+
+if __name__ == "__main__":
+    main()
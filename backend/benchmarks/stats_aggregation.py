@@ -0,0 +1,164 @@
+"""
+Monitor stats: ORM rows aggregated in python vs aggregation in SQL
+over raw rows vs stats answered from rollups.
+
+Seeds one monitor with a check every `--step-sec` seconds over `--days`
+(30 days of 15s checks ~ 170k rows) and its rollups in one transaction,
+measures latency and peak python memory of every path and rolls
+everything back.
+
+    python -m benchmarks.stats_aggregation --days 1 7 30
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config import get_settings
+from app.models import CheckResult
+from app.services.rollups import LATENCY_BUCKETS_MS, aggregate_raw_checks
+from app.services.stats import query_monitor_stats
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, email, hashed_password, is_active, is_superuser, created_at)
+    VALUES (gen_random_uuid(), 'bench-stats@example.com', 'x', true, false, now())
+    """,
+    """
+    INSERT INTO projects (id, name, owner_id, is_active)
+    SELECT gen_random_uuid(), 'bench', id, true
+    FROM users WHERE email = 'bench-stats@example.com'
+    """,
+    """
+    INSERT INTO monitors (id, project_id, name, target_url, check_interval_sec, is_active)
+    SELECT gen_random_uuid(), p.id, 'bench-stats', 'https://example.com/', 15, true
+    FROM projects p
+    WHERE p.name = 'bench'
+    """,
+    """
+    INSERT INTO check_results (id, monitor_id, checked_at, is_up, status_code,
+                               response_time_ms)
+    SELECT gen_random_uuid(), m.id, now() - g * :step * interval '1 second',
+           random() > 0.01, 200, (50 + random() * 200)::int
+    FROM monitors m, generate_series(0, :rows - 1) g
+    WHERE m.name = 'bench-stats'
+    """,
+    """
+    INSERT INTO check_result_rollups (monitor_id, bucket_sec, bucket_start,
+        total_checks, up_checks, response_time_sum, response_time_count,
+        response_time_min, response_time_max, latency_histogram)
+    SELECT monitor_id, s.sec,
+           to_timestamp(floor(extract(epoch FROM checked_at) / s.sec) * s.sec),
+           count(*), count(*) FILTER (WHERE is_up), coalesce(sum(response_time_ms), 0),
+           count(response_time_ms), min(response_time_ms), max(response_time_ms),
+           array_fill(0, ARRAY[:histogram_size])
+    FROM check_results, (VALUES (60), (3600), (86400)) AS s(sec)
+    WHERE monitor_id = (SELECT id FROM monitors WHERE name = 'bench-stats')
+    GROUP BY 1, 2, 3
+    """,
+]
+
+
+async def legacy_stats(db: AsyncSession, monitor_id, from_ts, to_ts) -> int:
+    """Previous path: every row of the range loaded as ORM object"""
+    results = (
+        await db.scalars(
+            select(CheckResult)
+            .where(
+                CheckResult.monitor_id == monitor_id,
+                CheckResult.checked_at >= from_ts,
+                CheckResult.checked_at <= to_ts,
+            )
+            .order_by(CheckResult.checked_at.desc())
+        )
+    ).all()
+    up_checks = sum(1 for r in results if r.is_up)
+    response_times = [
+        r.response_time_ms for r in results if r.response_time_ms is not None
+    ]
+    _ = sum(response_times) / len(response_times) if response_times else None
+    return up_checks
+
+
+async def measure(fn, *args) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    await fn(*args)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024 / 1024
+
+
+async def run(days_list: list[int], step_sec: int) -> None:
+    settings = get_settings()
+    engine = create_async_engine(settings.database_url)
+
+    max_days = max(days_list)
+    rows = max_days * 24 * 60 * 60 // step_sec
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            for sql in SEED_SQL:
+                await db.execute(
+                    text(sql),
+                    {
+                        "rows": rows,
+                        "step": step_sec,
+                        "histogram_size": len(LATENCY_BUCKETS_MS) + 1,
+                    },
+                )
+            await db.execute(text("ANALYZE check_results"))
+            await db.execute(text("ANALYZE check_result_rollups"))
+            monitor_id = await db.scalar(
+                text("SELECT id FROM monitors WHERE name = 'bench-stats'")
+            )
+
+            print(
+                f"{'days':>5} {'rows':>9} {'legacy ms':>10} {'legacy MiB':>11}"
+                f" {'sql ms':>8} {'sql MiB':>8} {'rollup ms':>10}"
+            )
+            for days in days_list:
+                to_ts = datetime.now(timezone.utc)
+                from_ts = to_ts - timedelta(days=days)
+
+                legacy_ms, legacy_mib = await measure(
+                    legacy_stats, db, monitor_id, from_ts, to_ts
+                )
+                db.expunge_all()
+                sql_ms, sql_mib = await measure(
+                    aggregate_raw_checks, db, monitor_id, [(from_ts, to_ts)], to_ts
+                )
+                rollup_ms, _ = await measure(
+                    query_monitor_stats, db, monitor_id, from_ts, to_ts
+                )
+                print(
+                    f"{days:>5} {days * 86400 // step_sec:>9} {legacy_ms:>10.1f}"
+                    f" {legacy_mib:>11.1f} {sql_ms:>8.1f} {sql_mib:>8.2f}"
+                    f" {rollup_ms:>10.1f}"
+                )
+        finally:
+            await db.close()
+            await trans.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 30])
+    parser.add_argument("--step-sec", type=int, default=15)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.days, args.step_sec))
+
+
+if __name__ == "__main__":
+    main()
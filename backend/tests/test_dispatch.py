@@ -0,0 +1,109 @@
+import asyncio
+
+from app.core.config import get_settings
+from app.services.dispatch import (
+    claim_dispatch,
+    get_dispatch_metrics,
+    inflight_ttl_sec,
+    release_dispatch,
+)
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return [
+            await getattr(self.redis_client, name)(*args, **kwargs)
+            for name, args, kwargs in self.calls
+        ]
+
+
+class FakeRedis:
+    """In-memory stand-in for the commands of in-flight tracking"""
+
+    def __init__(self):
+        self.data = {}
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        # the only script used here: compare-and-delete of in-flight marks
+        keys, (token,) = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        released = [key for key in keys if self.data.get(key) == token]
+        for key in released:
+            del self.data[key]
+        return len(released)
+
+    async def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    async def hgetall(self, key):
+        return {field: str(value) for field, value in self.hashes.get(key, {}).items()}
+
+
+def test_monitor_in_flight_is_not_dispatched_again():
+    redis_client = FakeRedis()
+
+    async def main():
+        first = await claim_dispatch(redis_client, ["a", "b"], 60, "t1")
+        # slow check of "a": the next poll sees it due again
+        second = await claim_dispatch(redis_client, ["a", "c"], 60, "t2")
+        await release_dispatch(redis_client, ["a"], "t1")
+        third = await claim_dispatch(redis_client, ["a"], 60, "t3")
+        return first, second, third, await get_dispatch_metrics(redis_client)
+
+    first, second, third, metrics = asyncio.run(main())
+
+    assert first == ["a", "b"]
+    assert second == ["c"]
+    assert third == ["a"]
+    assert metrics == {"dispatched": 4, "suppressed": 1}
+
+
+def test_late_release_keeps_the_mark_of_a_newer_claim():
+    redis_client = FakeRedis()
+
+    async def main():
+        await claim_dispatch(redis_client, ["a"], 60, "t1")
+        # the mark of "t1" expired, the monitor was claimed again
+        redis_client.data.clear()
+        await claim_dispatch(redis_client, ["a"], 60, "t2")
+        # the worker of "t1" finishes only now
+        await release_dispatch(redis_client, ["a"], "t1")
+        return await claim_dispatch(redis_client, ["a"], 60, "t3")
+
+    assert asyncio.run(main()) == []
+
+
+def test_inflight_ttl_covers_every_wave_of_checks():
+    settings = get_settings()
+
+    ttl = inflight_ttl_sec(100, 50, delay_sec=15)
+
+    assert ttl == 15 + 2 * settings.http_timeout_sec + (
+        settings.dispatch_inflight_margin_sec
+    )
@@ -0,0 +1,135 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy.exc import DBAPIError
+
+from app import probe_runner
+from app.services import monitoring, result_writer
+from app.services.result_writer import CheckResultWriter
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class PgError(Exception):
+    sqlstate = "08006"  # connection_failure
+
+
+class BadRowError(Exception):
+    sqlstate = "22001"  # string_data_right_truncation
+
+
+def test_claim_is_released_only_after_the_result_is_written(monkeypatch):
+    db_up = False
+    released = []
+
+    async def perform_http_check(target_url):
+        return {
+            "is_up": True,
+            "status_code": 200,
+            "response_time_ms": 10,
+            "error_message": None,
+        }
+
+    async def persist_check_results(db, batch):
+        if not db_up:
+            raise DBAPIError("INSERT INTO check_results ...", {}, PgError())
+
+    async def release_dispatch(redis_client, monitor_ids, token):
+        released.extend((monitor_id, token) for monitor_id in monitor_ids)
+
+    monkeypatch.setattr(monitoring, "perform_http_check", perform_http_check)
+    monkeypatch.setattr(result_writer, "persist_check_results", persist_check_results)
+    monkeypatch.setattr(probe_runner, "release_dispatch", release_dispatch)
+    monkeypatch.setattr(probe_runner, "get_redis_client", lambda: None)
+
+    runner = probe_runner.ProbeRunner()
+    runner.writer = CheckResultWriter(
+        FakeSession, max_batch=1, on_flushed=runner._release_results
+    )
+    monitor = SimpleNamespace(id=uuid.uuid4(), target_url="http://example.com/")
+    runner.inflight[str(monitor.id)] = "token"
+
+    async def main():
+        nonlocal db_up
+        # the flush fails: the result waits in the buffer, the claim is kept
+        await runner._probe(monitor)
+        kept = list(released), dict(runner.inflight), len(runner.writer)
+
+        db_up = True
+        await runner.writer.flush()
+        return kept
+
+    kept = asyncio.run(main())
+
+    assert kept == ([], {str(monitor.id): "token"}, 1)
+    assert released == [(str(monitor.id), "token")]
+    assert runner.inflight == {}
+
+
+def test_monitor_of_dropped_result_is_polled_again(monkeypatch):
+    monitor = SimpleNamespace(id=uuid.uuid4(), target_url="http://example.com/")
+    checks = []
+
+    async def perform_http_check(target_url):
+        checks.append(target_url)
+        return {
+            "is_up": False,
+            "status_code": None,
+            "response_time_ms": None,
+            "error_message": "x" * 2000,
+        }
+
+    async def persist_check_results(db, batch):
+        raise DBAPIError("INSERT INTO check_results ...", {}, BadRowError())
+
+    async def get_due_monitor_runs(db, now, limit=None):
+        return [(monitor.id, now)]
+
+    async def get_active_monitors_by_ids(db, monitor_ids):
+        return [monitor]
+
+    async def claim_dispatch(redis_client, monitor_ids, ttl_sec, token):
+        return list(monitor_ids)
+
+    async def release_dispatch(redis_client, monitor_ids, token):
+        pass
+
+    monkeypatch.setattr(monitoring, "perform_http_check", perform_http_check)
+    monkeypatch.setattr(result_writer, "persist_check_results", persist_check_results)
+    monkeypatch.setattr(probe_runner, "runner_session_maker", FakeSession)
+    monkeypatch.setattr(probe_runner, "get_due_monitor_runs", get_due_monitor_runs)
+    monkeypatch.setattr(
+        probe_runner, "get_active_monitors_by_ids", get_active_monitors_by_ids
+    )
+    monkeypatch.setattr(probe_runner, "claim_dispatch", claim_dispatch)
+    monkeypatch.setattr(probe_runner, "release_dispatch", release_dispatch)
+    monkeypatch.setattr(probe_runner, "get_redis_client", lambda: None)
+
+    runner = probe_runner.ProbeRunner()
+    runner.writer = CheckResultWriter(
+        FakeSession,
+        max_batch=1,
+        on_flushed=runner._release_results,
+        on_dropped=runner._release_results,
+    )
+
+    async def main():
+        started = []
+        for _ in range(2):
+            started.append(await runner.poll())
+            await asyncio.gather(*runner.probes)
+        return started
+
+    started = asyncio.run(main())
+
+    # the result can't be written: the claim is given up, the run stays due
+    assert started == [1, 1]
+    assert len(checks) == 2
+    assert runner.inflight == {}
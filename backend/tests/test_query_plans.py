@@ -0,0 +1,248 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.crud.check_result import get_checks_in_period, get_recent_results_for_monitor
+from app.crud.monitor import get_due_monitor_runs
+from app.models.check_result import CheckResult as CheckResultModel
+from app.models.monitor import Monitor as MonitorModel
+from app.models.project import Project as ProjectModel
+from app.models.user import User as UserModel
+from app.services.stats import query_monitor_stats
+
+MONITORS = 2000
+# monitors with history, the rest only spread the due-queue
+MONITORS_WITH_CHECKS = 20
+CHECKS_PER_MONITOR = 2000
+
+CHECKS_INDEX = "ix_check_results_monitor_id_checked_at"
+DUE_MONITORS_INDEX = "ix_monitors_next_check_at_active"
+ROLLUPS_INDEX = "check_result_rollups_pkey"
+
+
+class _NoRows:
+    def all(self):
+        return []
+
+    def first(self):
+        return None
+
+    def one(self):
+        # row of the stats aggregates
+        return 0, 0, None, 0, None, None
+
+
+class StatementRecorder:
+    """
+    Stands in for AsyncSession: keeps statements of crud functions, returns no rows
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    async def scalars(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return _NoRows()
+
+    async def scalar(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return None
+
+    async def execute(self, statement, *args, **kwargs):
+        self.statements.append(statement)
+        return _NoRows()
+
+
+def record_statements(crud_call) -> list:
+    recorder = StatementRecorder()
+    asyncio.run(crud_call(recorder))
+    return recorder.statements
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+def seeded_monitor_id(engine):
+    """
+    Monitors, a few of them with history and its rollups,
+    statistics refreshed for the planner
+    """
+    now = datetime.now(timezone.utc)
+
+    with engine.begin() as conn:
+        user_id = conn.scalar(
+            insert(UserModel)
+            .values(
+                id=uuid.uuid4(),
+                email=f"plans-{uuid.uuid4()}@example.com",
+                hashed_password="x",
+                is_active=True,
+                is_superuser=False,
+                created_at=now,
+            )
+            .returning(UserModel.id)
+        )
+        project_id = conn.scalar(
+            insert(ProjectModel)
+            .values(id=uuid.uuid4(), name="plans", owner_id=user_id, is_active=True)
+            .returning(ProjectModel.id)
+        )
+        monitor_ids = conn.scalars(
+            insert(MonitorModel).returning(MonitorModel.id),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "project_id": project_id,
+                    "name": f"plans-{i}",
+                    "target_url": "https://example.com/",
+                    "check_interval_sec": 60 * 60,
+                    "is_active": True,
+                    # one due, the rest later within the interval
+                    "next_check_at": now + timedelta(seconds=i * 1.8),
+                }
+                for i in range(MONITORS)
+            ],
+        ).all()[:MONITORS_WITH_CHECKS]
+        conn.execute(
+            insert(CheckResultModel),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "monitor_id": monitor_id,
+                    "checked_at": now - timedelta(minutes=i),
+                    "is_up": True,
+                    "status_code": 200,
+                    "response_time_ms": 100,
+                }
+                # written as the checks run: oldest first, monitors interleaved
+                for i in reversed(range(CHECKS_PER_MONITOR))
+                for monitor_id in monitor_ids
+            ],
+        )
+        for bucket_sec, unit in ((60, "minute"), (60 * 60, "hour")):
+            conn.execute(
+                text(
+                    "INSERT INTO check_result_rollups (monitor_id, bucket_sec, "
+                    "bucket_start, total_checks, up_checks, response_time_sum, "
+                    "response_time_count, response_time_min, response_time_max, "
+                    "latency_histogram) "
+                    f"SELECT monitor_id, {bucket_sec}, "
+                    f"date_trunc('{unit}', checked_at), "
+                    "count(*), count(*) FILTER (WHERE is_up), sum(response_time_ms), "
+                    "count(response_time_ms), min(response_time_ms), "
+                    "max(response_time_ms), '{}' "
+                    "FROM check_results GROUP BY 1, 3"
+                )
+            )
+
+    # visibility map for index-only scans, statistics for the planner
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE monitors"))
+        conn.execute(text("VACUUM ANALYZE check_results"))
+        conn.execute(text("VACUUM ANALYZE check_result_rollups"))
+
+    return monitor_ids[0]
+
+
+def assert_plan_uses_index(engine, statement, *indexes):
+    """
+    Plan of `statement` with default planner settings reads through one of
+    `indexes` (or their partition indexes) in the order of the query:
+    no seq scan, no scan of another index, no (incremental) sort
+    """
+    sql = str(
+        statement.compile(
+            dialect=engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+
+    with engine.connect() as conn:
+        expected = set(indexes) | set(
+            conn.scalars(
+                text(
+                    "SELECT child.relname FROM pg_inherits "
+                    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                    "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                    "WHERE parent.relname = ANY(:indexes)"
+                ),
+                {"indexes": list(indexes)},
+            )
+        )
+        raw_plan = conn.scalar(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+
+    if isinstance(raw_plan, str):
+        raw_plan = json.loads(raw_plan)
+    nodes = list(plan_nodes(raw_plan[0]["Plan"]))
+
+    bad_nodes = [
+        node["Node Type"]
+        for node in nodes
+        if node["Node Type"] in ("Seq Scan", "Sort", "Incremental Sort")
+    ]
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert not bad_nodes, f"{bad_nodes} in plan of:\n{sql}"
+    assert used and used <= expected, f"{used} instead of {indexes} for:\n{sql}"
+
+
+def test_checks_in_period_uses_index(engine, seeded_monitor_id):
+    now = datetime.now(timezone.utc)
+    statements = record_statements(
+        lambda db: get_checks_in_period(
+            db, seeded_monitor_id, now - timedelta(hours=24), now, 100
+        )
+    )
+
+    for statement in statements:
+        assert_plan_uses_index(engine, statement, CHECKS_INDEX)
+
+
+def test_recent_results_uses_index(engine, seeded_monitor_id):
+    statements = record_statements(
+        lambda db: get_recent_results_for_monitor(db, seeded_monitor_id, 20)
+    )
+
+    for statement in statements:
+        assert_plan_uses_index(engine, statement, CHECKS_INDEX)
+
+
+def test_due_monitors_uses_index(engine, seeded_monitor_id):
+    statements = record_statements(
+        lambda db: get_due_monitor_runs(db, datetime.now(timezone.utc))
+    )
+
+    for statement in statements:
+        assert_plan_uses_index(engine, statement, DUE_MONITORS_INDEX)
+
+
+def test_monitor_stats_uses_index(engine, seeded_monitor_id):
+    now = datetime.now(timezone.utc)
+    statements = record_statements(
+        lambda db: query_monitor_stats(
+            db, seeded_monitor_id, now - timedelta(hours=24), now
+        )
+    )
+
+    assert statements
+    for statement in statements:
+        assert_plan_uses_index(engine, statement, CHECKS_INDEX, ROLLUPS_INDEX)
+
+
+def test_deep_history_page_uses_index(engine, seeded_monitor_id):
+    now = datetime.now(timezone.utc)
+    after = (now - timedelta(minutes=CHECKS_PER_MONITOR // 2), uuid.uuid4())
+    statements = record_statements(
+        lambda db: get_checks_in_period(
+            db, seeded_monitor_id, now - timedelta(days=30), now, 100, after
+        )
+    )
+
+    for statement in statements:
+        assert_plan_uses_index(engine, statement, CHECKS_INDEX)
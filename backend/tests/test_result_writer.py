@@ -0,0 +1,115 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.services import result_writer
+from app.services.result_writer import CheckResultWriter, PendingCheckResult
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class PgError(Exception):
+    def __init__(self, sqlstate):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def db_error(sqlstate: str) -> DBAPIError:
+    return DBAPIError("INSERT INTO check_results ...", {}, PgError(sqlstate))
+
+
+def pending(error_message: str | None = None) -> PendingCheckResult:
+    return PendingCheckResult(
+        monitor_id=uuid.uuid4(),
+        checked_at=datetime.now(timezone.utc),
+        is_up=error_message is None,
+        status_code=200 if error_message is None else None,
+        response_time_ms=10,
+        error_message=error_message,
+    )
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """Rows are written unless an error is longer than the column"""
+    rows = []
+
+    async def persist_check_results(db, batch):
+        if any(len(item.error_message or "") > 1000 for item in batch):
+            raise db_error("22001")  # string_data_right_truncation
+        rows.extend(batch)
+
+    monkeypatch.setattr(result_writer, "persist_check_results", persist_check_results)
+    return rows
+
+
+def test_bad_row_is_dropped_and_does_not_block_the_rest(written):
+    flushed, dropped = [], []
+
+    async def on_flushed(batch):
+        flushed.extend(batch)
+
+    async def on_dropped(batch):
+        dropped.extend(batch)
+
+    writer = CheckResultWriter(
+        FakeSession, max_batch=100, on_flushed=on_flushed, on_dropped=on_dropped
+    )
+    good = [pending() for _ in range(6)]
+    bad = pending("x" * 2000)
+
+    async def main():
+        for item in good[:3] + [bad] + good[3:]:
+            await writer.add(item)
+        await writer.flush()
+        await writer.add(pending())
+        await writer.flush()
+
+    asyncio.run(main())
+
+    assert bad not in written
+    assert len(written) == 7
+    assert flushed == written
+    assert dropped == [bad]
+    assert len(writer) == 0
+
+
+def test_transient_error_is_retried_a_bounded_number_of_times(monkeypatch):
+    attempts = []
+
+    async def persist_check_results(db, batch):
+        attempts.append(len(batch))
+        raise db_error("08006")  # connection_failure
+
+    monkeypatch.setattr(result_writer, "persist_check_results", persist_check_results)
+    dropped = []
+
+    async def on_dropped(batch):
+        dropped.extend(batch)
+
+    writer = CheckResultWriter(
+        FakeSession, max_batch=100, max_retries=2, on_dropped=on_dropped
+    )
+
+    async def main():
+        await writer.add(pending())
+        await writer.add(pending())
+        for _ in range(3):
+            with pytest.raises(DBAPIError):
+                await writer.flush()
+
+    asyncio.run(main())
+
+    # kept whole for the retries, then dropped
+    assert attempts == [2, 2, 2]
+    assert len(writer) == 0
+    assert len(dropped) == 2
@@ -0,0 +1,40 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from app.services import rollups
+from app.services.rollups import StatsAggregate, aggregate_checks
+
+
+def ts(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2026, 1, day, hour, minute, tzinfo=timezone.utc)
+
+
+def test_purged_minute_buckets_are_read_from_raw_rows(monkeypatch):
+    read = {}
+
+    async def aggregate_rollups(db, monitor_id, segments):
+        read["rollups"] = segments
+        return StatsAggregate()
+
+    async def aggregate_raw_checks(db, monitor_id, segments, to_ts=None):
+        read["raw"] = segments
+        return StatsAggregate()
+
+    monkeypatch.setattr(rollups, "aggregate_rollups", aggregate_rollups)
+    monkeypatch.setattr(rollups, "aggregate_raw_checks", aggregate_raw_checks)
+
+    # minute buckets are kept for 7 days: those of Jan 1 are gone
+    asyncio.run(
+        aggregate_checks(
+            None, uuid.uuid4(), ts(1, 10, 37), ts(3, 15, 20), now=ts(10, 12)
+        )
+    )
+
+    assert read["rollups"] == [
+        (60 * 60, ts(1, 11), ts(2, 0)),
+        (24 * 60 * 60, ts(2, 0), ts(3, 0)),
+        (60 * 60, ts(3, 0), ts(3, 15)),
+        (60, ts(3, 15), ts(3, 15, 20)),
+    ]
+    assert read["raw"] == [(ts(1, 10, 37), ts(1, 11)), (ts(3, 15, 20), ts(3, 15, 20))]
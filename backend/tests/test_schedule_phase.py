@@ -0,0 +1,80 @@
+import math
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.schedule_phase import next_phase_run, phase_offset_sec
+from app.services.schedule import plan_dispatch
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_phase_is_deterministic_and_inside_interval():
+    monitor_id = uuid.uuid4()
+
+    offset = phase_offset_sec(monitor_id, 60)
+
+    assert offset == phase_offset_sec(monitor_id, 60)
+    assert 0 <= offset < 60
+
+
+def test_next_phase_run_keeps_phase():
+    monitor_id = uuid.uuid4()
+
+    first = next_phase_run(monitor_id, 60, START)
+    second = next_phase_run(monitor_id, 60, first)
+
+    assert START < first <= START + timedelta(seconds=60)
+    assert second - first == timedelta(seconds=60)
+
+
+def test_monitors_created_together_are_spread():
+    runs = [next_phase_run(uuid.uuid4(), 60, START) for _ in range(600)]
+
+    per_second = {int((run - START).total_seconds()) for run in runs}
+
+    # ~10 per second when spread, 1 second when all fire together
+    assert len(per_second) > 50
+
+
+def test_plan_dispatch_starts_runs_at_their_due_time():
+    now = START
+    due_runs = [(uuid.uuid4(), START + timedelta(seconds=s)) for s in (-3, 1, 1, 7, 14)]
+
+    batches = plan_dispatch(due_runs, now, batch_size=100)
+
+    assert [(countdown, len(ids)) for countdown, ids in batches] == [
+        (0.0, 1),
+        (1.0, 2),
+        (7.0, 1),
+        (14.0, 1),
+    ]
+
+
+def advance(next_check_at: datetime, checked_at: datetime, interval: int) -> datetime:
+    """Same arithmetic as `advance_monitors_schedule`"""
+    missed_runs = math.floor((checked_at - next_check_at).total_seconds() / interval)
+    return next_check_at + timedelta(seconds=(missed_runs + 1) * interval)
+
+
+def test_beat_keeps_every_run_of_monitor_as_frequent_as_beat():
+    beat_sec, probe_sec = 15, 0.5
+    next_check_at = next_phase_run(uuid.uuid4(), beat_sec, START)
+    checked = []
+    written_at = None  # the dispatched run is claimed until it's written
+
+    for poll in range(1, 41):
+        now = START + timedelta(seconds=poll * beat_sec)
+        if written_at is not None and written_at > now:
+            continue
+        if next_check_at > now + timedelta(seconds=beat_sec):
+            continue
+        [(countdown, _)] = plan_dispatch([(uuid.uuid4(), next_check_at)], now, 100)
+        assert countdown < beat_sec
+        checked_at = now + timedelta(seconds=countdown)
+        written_at = checked_at + timedelta(seconds=probe_sec)
+        checked.append(checked_at)
+        next_check_at = advance(next_check_at, checked_at, beat_sec)
+
+    gaps = {(b - a).total_seconds() for a, b in zip(checked, checked[1:])}
+    assert len(checked) >= 39
+    assert gaps == {beat_sec}
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from app import scheduler
+from app.core.config import get_settings
+from app.services.schedule import SCHEDULE_SLOTS
+from app.services.scheduler_membership import (
+    LEADER_KEY,
+    MEMBERS_KEY,
+    SchedulerMembership,
+    owned_slots,
+)
+
+
+def assignment(members):
+    return {member: set(owned_slots(member, members)) for member in members}
+
+
+def test_every_slot_has_exactly_one_owner():
+    members = [f"scheduler-{i}" for i in range(5)]
+
+    owned = assignment(members)
+
+    all_slots = [slot for slots in owned.values() for slot in slots]
+    assert sorted(all_slots) == list(range(SCHEDULE_SLOTS))
+    # roughly even shares
+    assert all(len(slots) > SCHEDULE_SLOTS / 5 / 3 for slots in owned.values())
+
+
+def test_leaving_member_moves_only_its_slots():
+    members = [f"scheduler-{i}" for i in range(4)]
+    before = assignment(members)
+
+    after = assignment(members[:-1])
+
+    for member in members[:-1]:
+        assert before[member] <= after[member]
+    moved = set().union(*after.values()) - set().union(
+        *(before[member] for member in members[:-1])
+    )
+    assert moved == before[members[-1]]
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return queue
+
+    async def execute(self):
+        return await self.redis_client.execute(self.calls)
+
+
+class FakeRedis:
+    """
+    Members / leader keys of one instance alone, the wheel is empty.
+    `failures` next round-trips raise like a dropped connection
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.heartbeats = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def execute(self, calls):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Connection reset by peer")
+
+        results = []
+        for name, args, kwargs in calls:
+            if name == "zadd" and args[0] == MEMBERS_KEY:
+                self.heartbeats += 1
+                self.member = next(iter(args[1]))
+            if name == "zrange":
+                results.append([] if kwargs.get("withscores") else [self.member])
+            elif name == "eval":
+                # the leader lease or a pop of an empty slot
+                results.append(1 if args[2] == LEADER_KEY else [])
+            else:
+                results.append(1)
+        return results
+
+
+def test_failed_heartbeat_keeps_slots_until_the_lease_expires():
+    redis_client = FakeRedis()
+    membership = SchedulerMembership(redis_client, lease_sec=0.05)
+
+    async def main():
+        await membership.heartbeat()
+        owned = list(membership.slots)
+
+        redis_client.failures = 2
+        with pytest.raises(ConnectionError):
+            await membership.heartbeat()
+        kept = list(membership.slots), membership.is_leader
+
+        await asyncio.sleep(0.05)
+        with pytest.raises(ConnectionError):
+            await membership.heartbeat()
+        return owned, kept, (membership.slots, membership.is_leader)
+
+    owned, kept, expired = asyncio.run(main())
+
+    assert owned == list(range(SCHEDULE_SLOTS))
+    assert kept == (owned, True)
+    assert expired == ([], False)
+
+
+def test_scheduler_keeps_running_after_a_redis_error(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "scheduler_lease_sec", 0.03)
+    monkeypatch.setattr(settings, "scheduler_max_sleep_sec", 0.01)
+
+    redis_client = FakeRedis(failures=1)
+    membership = SchedulerMembership(redis_client, settings.scheduler_lease_sec)
+    resyncs = []
+
+    async def resync_schedule():
+        resyncs.append(membership.instance_id)
+
+    monkeypatch.setattr(scheduler, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(scheduler, "resync_schedule", resync_schedule)
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.create_task(scheduler.run_scheduler(stop, membership))
+        while redis_client.heartbeats < 3 and not loop.done():
+            await asyncio.sleep(0.01)
+        stop.set()
+        await loop
+
+    asyncio.run(asyncio.wait_for(main(), timeout=5))
+
+    # the first heartbeat failed, the loop went on and took over
+    assert redis_client.heartbeats >= 3
+    assert resyncs == [membership.instance_id]
+    assert membership.slots == list(range(SCHEDULE_SLOTS))
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from app.schemas.monitor import MonitorStats
+from app.services import stats
+from app.services.result_writer import PendingCheckResult
+from app.services.stats import get_or_compute_cached
+
+READERS = 500
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the commands of the stats cache,
+    every call yields to the loop like a network round-trip
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        await asyncio.sleep(0)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        # the only script used here: release the lock held with `token`
+        await asyncio.sleep(0)
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class CountingQuery:
+    """Heavy stats query: counts calls, takes a while"""
+
+    def __init__(self, delay_sec=0.2):
+        self.calls = 0
+        self.delay_sec = delay_sec
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay_sec)
+        return json.dumps({"total_checks": self.calls})
+
+
+def run_readers(redis_client, query, key="monitor:1:stats", per_process=False):
+    async def read():
+        if per_process:
+            # as if every reader were another worker: no shared in-flight task
+            stats._inflight.clear()
+        return await get_or_compute_cached(
+            redis_client, key, query, ttl_sec=10, stale_sec=60
+        )
+
+    async def main():
+        return await asyncio.gather(*(read() for _ in range(READERS)))
+
+    return asyncio.run(main())
+
+
+def test_cold_key_is_computed_once():
+    redis_client, query = FakeRedis(), CountingQuery()
+
+    values = run_readers(redis_client, query)
+
+    assert query.calls == 1
+    assert set(values) == {json.dumps({"total_checks": 1})}
+
+
+def test_cold_key_is_computed_once_across_processes():
+    redis_client, query = FakeRedis(), CountingQuery()
+
+    values = run_readers(redis_client, query, per_process=True)
+
+    assert query.calls == 1
+    assert set(values) == {json.dumps({"total_checks": 1})}
+
+
+def test_expired_key_is_recomputed_once_and_stale_value_served():
+    redis_client, query = FakeRedis(), CountingQuery()
+    stale_value = json.dumps({"total_checks": 0})
+    redis_client.data["monitor:1:stats"] = json.dumps(
+        {"value": stale_value, "delta": 0.2, "expiry": time.time() - 1}
+    )
+
+    values = run_readers(redis_client, query, per_process=True)
+
+    assert query.calls == 1
+    # everybody but the lock holder got the stale value without waiting
+    assert values.count(stale_value) == READERS - 1
+    assert json.loads(redis_client.data["monitor:1:stats"])["value"] == json.dumps(
+        {"total_checks": 1}
+    )
+
+
+def test_fresh_key_is_not_recomputed():
+    redis_client, query = FakeRedis(), CountingQuery()
+    redis_client.data["monitor:1:stats"] = json.dumps(
+        {"value": "cached", "delta": 0.0, "expiry": time.time() + 60}
+    )
+
+    values = run_readers(redis_client, query, per_process=True)
+
+    assert query.calls == 0
+    assert set(values) == {"cached"}
+
+
+class FakeWindowRedis:
+    """
+    Hashes and lists with the stats window scripts mirrored in Python,
+    every script runs atomically like in Redis
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.lists = {}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline()
+
+    def register_script(self, script):
+        async def run(keys, args, client=None):
+            return await self.eval(script, len(keys), *keys, *args)
+
+        return run
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        (key, pending_key), args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        args = [str(arg) for arg in args]
+        window = self.hashes.setdefault(key, {})
+
+        if script is stats._BEGIN_SEED_LUA:
+            self.hashes[key] = {"seeding": args[0]}
+            self.lists.pop(pending_key, None)
+            return 1
+
+        if script is stats._RECORD_CHECKS_LUA:
+            if window.get("seeded"):
+                if self._visible_in_seed(window, args[9]):
+                    return 0
+                self._add_checks(window, *args[1:9])
+                return 1
+            if window.get("seeding"):
+                self.lists.setdefault(pending_key, []).append(json.dumps(args))
+                return 2
+            return 0
+
+        assert script is stats._FINISH_SEED_LUA
+        if window.get("seeding") != args[0]:
+            return 0
+        del window["seeding"]
+        window.update(
+            seeded="1", snap_xmin=args[2], snap_xmax=args[3], snap_xip=args[4]
+        )
+        window.update(zip(args[5::2], args[6::2]))
+        for pending in self.lists.pop(pending_key, []):
+            pending = json.loads(pending)
+            if not self._visible_in_seed(window, pending[9]):
+                self._add_checks(window, *pending[1:9])
+        return 1
+
+    @staticmethod
+    def _visible_in_seed(window, xid):
+        if int(xid) < int(window["snap_xmin"]):
+            return True
+        if int(xid) >= int(window["snap_xmax"]):
+            return False
+        return f",{xid}," in window["snap_xip"]
+
+    @staticmethod
+    def _add_checks(window, minute, t, u, s, c, last_at, last_up, last_code):
+        for counter, value in zip("tusc", (t, u, s, c)):
+            field = f"m:{minute}:{counter}"
+            window[field] = str(int(window.get(field, 0)) + int(value))
+        if float(last_at) > float(window.get("last_at", 0)):
+            window.update(last_at=last_at, last_up=last_up, last_code=last_code)
+
+
+class FakePipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return []
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeSeedDb:
+    """Rollups read by the seed, `on_read` runs while the seed is in db"""
+
+    def __init__(self, snapshot, rollups, on_read):
+        self.snapshot = snapshot
+        self.rollups = rollups
+        self.on_read = on_read
+        self.reads = 0
+
+    async def execute(self, statement):
+        self.reads += 1
+        if self.reads > 1:
+            # last check of the window
+            return FakeResult([])
+        await self.on_read()
+        return FakeResult(
+            [(self.snapshot, start, *counters) for start, counters in self.rollups]
+        )
+
+
+def test_checks_recorded_while_seeding_are_counted_once():
+    monitor_id = "00000000-0000-0000-0000-000000000001"
+    now = datetime(2026, 1, 1, 12, 30, 30, tzinfo=timezone.utc)
+    minute = datetime(2026, 1, 1, 12, 30, tzinfo=timezone.utc)
+    redis_client = FakeWindowRedis()
+
+    def check():
+        return [PendingCheckResult(monitor_id, now, True, 200, 10, None)]
+
+    async def committed_after_read():
+        # written by xact 101, in progress for the seed's snapshot
+        await stats.record_checks_in_stats_cache(redis_client, check(), 101)
+
+    # rollups had the checks of xacts 99 and 100, 101 was not committed yet
+    db = FakeSeedDb("100:102:101", [(minute, (2, 2, 20, 2))], committed_after_read)
+
+    async def main():
+        # xact 99: recorded before the seed, dropped, in the rollups
+        await stats.record_checks_in_stats_cache(redis_client, check(), 99)
+        seeded = await stats.seed_stats_cache(db, redis_client, monitor_id, now)
+        # xact 100: committed before the seed read, recorded after the seed
+        await stats.record_checks_in_stats_cache(redis_client, check(), 100)
+        # xact 102: committed and recorded after the seed
+        await stats.record_checks_in_stats_cache(redis_client, check(), 102)
+        cached = await stats.get_cached_stats(redis_client, monitor_id, now)
+        return seeded, cached
+
+    seeded, cached = asyncio.run(main())
+
+    assert seeded.total_checks == 2
+    assert cached.total_checks == 4
+    assert cached.avg_response_time_ms == 10
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+        return False
+
+
+def test_window_seed_outlives_the_reader_which_started_it(monkeypatch):
+    monitor_id = "00000000-0000-0000-0000-000000000002"
+    now = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    sessions = []
+
+    def async_session_maker():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    async def get_cached_stats(redis_client, monitor_id, now):
+        return None
+
+    async def seed_stats_cache(db, redis_client, monitor_id, now_):
+        await asyncio.sleep(0.05)
+        assert not db.closed
+        return MonitorStats(
+            monitor_id=monitor_id, from_ts=now, to_ts=now, total_checks=3
+        )
+
+    redis_client = FakeRedis()
+    monkeypatch.setattr(stats, "get_redis_client", lambda: redis_client)
+    monkeypatch.setattr(stats, "async_session_maker", async_session_maker)
+    monkeypatch.setattr(stats, "get_cached_stats", get_cached_stats)
+    monkeypatch.setattr(stats, "seed_stats_cache", seed_stats_cache)
+
+    async def main():
+        first = asyncio.create_task(stats.compute_monitor_stats(None, monitor_id))
+        second = asyncio.create_task(stats.compute_monitor_stats(None, monitor_id))
+        await asyncio.sleep(0.01)
+        # the request which started the seed is gone, its session closed
+        first.cancel()
+        return await second
+
+    result = asyncio.run(main())
+
+    assert result.total_checks == 3
+    assert len(sessions) == 1
+    assert sessions[0].closed
@@ -47,12 +47,27 @@ export async function getMonitorChecks(
 	return r.data
 }
 
+// history is paged, the next page cursor comes in X-Next-Cursor header.
+// A day of 15s checks fits, longer ranges stop at the cap instead of
+// downloading every row: charts of those need the bucketed series (max_points)
+export const CHECKS_HISTORY_PAGE_SIZE = 1000;
+export const CHECKS_HISTORY_MAX_PAGES = 10;
+
 export const getMonitorChecksHistory = async (id: string, from: Date, to: Date): Promise<CheckResult[]> => {
-    const response = await api.get<CheckResult[]>(`/monitors/${id}/checks-history`, {
-        params: {
-            from_ts: from.toISOString(),
-            to_ts: to.toISOString()
-        }
-    });
-    return response.data;
+    const checks: CheckResult[] = [];
+    let cursor: string | undefined;
+    for (let page = 0; page < CHECKS_HISTORY_MAX_PAGES; page++) {
+        const response = await api.get<CheckResult[]>(`/monitors/${id}/checks-history`, {
+            params: {
+                from_ts: from.toISOString(),
+                to_ts: to.toISOString(),
+                limit: CHECKS_HISTORY_PAGE_SIZE,
+                cursor
+            }
+        });
+        checks.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+        if (!cursor) break;
+    }
+    return checks;
 };
\ No newline at end of file
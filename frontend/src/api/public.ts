@@ -4,6 +4,7 @@ import { api } from './client'; // Импортируем инстанс, что
 // Импортируем типы. Убедитесь, что путь правильный (обычно './monitors' или './monitor')
 // Если у вас файл называется monitors.ts, то путь './monitors'. Если monitor.ts, то './monitor'
 import type { Monitor, MonitorStats, CheckResult } from './monitors';
+import { CHECKS_HISTORY_MAX_PAGES, CHECKS_HISTORY_PAGE_SIZE } from './monitor';
 
 // --- Types for Public Projects ---
 export interface PublicProject {
@@ -66,11 +67,21 @@ export async function getPublicMonitorStats(monitorId: string, fromTs?: Date, to
 
 // История проверок монитора
 export async function getPublicChecksHistory(monitorId: string, fromTs: Date, toTs: Date): Promise<CheckResult[]> {
-    const response = await axios.get<CheckResult[]>(`${BASE_URL}/public/monitors/${monitorId}/checks-history`, {
-        params: {
-            from_ts: fromTs.toISOString(),
-            to_ts: toTs.toISOString(),
-        }
-    });
-    return response.data;
+    const checks: CheckResult[] = [];
+    let cursor: string | undefined;
+    // pages by X-Next-Cursor header, at most CHECKS_HISTORY_MAX_PAGES of them
+    for (let page = 0; page < CHECKS_HISTORY_MAX_PAGES; page++) {
+        const response = await axios.get<CheckResult[]>(`${BASE_URL}/public/monitors/${monitorId}/checks-history`, {
+            params: {
+                from_ts: fromTs.toISOString(),
+                to_ts: toTs.toISOString(),
+                limit: CHECKS_HISTORY_PAGE_SIZE,
+                cursor,
+            }
+        });
+        checks.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+        if (!cursor) break;
+    }
+    return checks;
 }
\ No newline at end of file